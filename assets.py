@@ -0,0 +1,53 @@
+import pygame
+
+IMAGE_FILES = {
+    'mine': './imgs/mine.bmp',
+    'marked_mine': './imgs/marked_mine.bmp',
+    'default_smile': './imgs/default_smile.png',
+    'win_smile': './imgs/win_smile.png',
+    'dead_smile': './imgs/dead_smile.png',
+    'icon_mine': './imgs/icon_mine.bmp',
+}
+
+# Images loaded from disk (file: surface) and their scaled variants
+# ((picture_type, box_height, clicked): surface). Surfaces are shared, so
+# they must not be drawn into.
+_loaded_images = {}
+_scaled_images = {}
+
+def load_image(picture_type):
+    """Return image of given picture type. It is loaded from disk only once."""
+    file = IMAGE_FILES[picture_type]
+    image = _loaded_images.get(file)
+    if image is None:
+        image = pygame.image.load(file)
+        _loaded_images[file] = image
+    return image
+
+def get_scaled_image(picture_type, box_height, clicked=False):
+    """Return image of given picture type scaled to fit into box of
+    box_height. Each variant is scaled only once."""
+    key = (picture_type, box_height, clicked)
+    image = _scaled_images.get(key)
+    if image is None:
+        image = _scale_img(load_image(picture_type), box_height - 
+            _get_margin(picture_type, clicked))
+        _scaled_images[key] = image
+    return image
+
+def _get_margin(picture_type, clicked):
+    """Return by how much image needs to be smaller than its box."""
+    if picture_type == 'mine':
+        return 8
+    elif picture_type == 'marked_mine':
+        return 15
+    elif clicked:
+        # smiles on clicked restart button
+        return 15
+    return 12
+
+def _scale_img(img, new_height):
+    """Scale given image to new_height keeping its aspect ratio."""
+    original_size = img.get_size()
+    new_width = round((original_size[0] / original_size[1]) * new_height)
+    return pygame.transform.scale(img, (new_width, new_height))
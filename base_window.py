@@ -1,6 +1,8 @@
 import pygame
 
+from assets import load_image
 from draw_lines_around_rect import draw_lines_around_rect as rect_lines
+from profiler import profiler
 from restart_button import RestartButton
 
 class BaseWindow:
@@ -13,15 +15,17 @@ class BaseWindow:
         self.create_game_window()
     
     def set_window_icon(self):
-        icon_file = './imgs/icon_mine.bmp'
-        image = pygame.image.load(icon_file)
+        image = load_image('icon_mine')
         pygame.display.set_icon(image)
     
     def create_game_window(self):
-        """Create game window"""
-        window_width = ((self.settings.box_width * self.settings.columns) +
+        """Create game window. Window is as big as the visible part of the
+        board."""
+        view_columns = min(self.settings.columns, self.settings.view_columns)
+        view_rows = min(self.settings.rows, self.settings.view_rows)
+        window_width = ((self.settings.box_width * view_columns) +
             (self.settings.thickness_of_edges * 2))
-        window_height = ((self.settings.box_height * (self.settings.rows + 3)) +
+        window_height = ((self.settings.box_height * (view_rows + 3)) +
             (self.settings.thickness_of_edges * 3))
         pygame.display.set_caption("Minesweeper")
         self.screen = pygame.display.set_mode((window_width, window_height))
@@ -32,6 +36,7 @@ class BaseWindow:
     def fill_bg(self):
         """Fill background with color."""
         self.screen.fill(self.settings.bg_color)
+        self.mines_game.dirty_rects.add_all()
 
 class Gui:
     """Class that manages creation of basic game GUI."""
@@ -48,9 +53,11 @@ class Gui:
         
     def create_gui_rects(self):
         """Creates all basic gui rects."""
-        # Create body rect.
-        br_width = self.settings.box_width * self.settings.columns
-        br_height = self.settings.box_height * self.settings.rows
+        # Create body rect. It shows visible part of the board.
+        br_width = self.settings.box_width * min(self.settings.columns,
+            self.settings.view_columns)
+        br_height = self.settings.box_height * min(self.settings.rows,
+            self.settings.view_rows)
         br_left_edge = self.settings.thickness_of_edges
         br_top_edge = self.screen_rect.height - (
             self.settings.thickness_of_edges + br_height)
@@ -68,6 +75,7 @@ class Gui:
         self.menu_bar_rect = pygame.Rect(0, 0, mb_width, mb_height)
         self.menu_bar_rect_color = self.settings.menu_color
         self.screen.fill(self.menu_bar_rect_color, self.menu_bar_rect)
+        self.mines_game.dirty_rects.add(self.menu_bar_rect)
         
         # Create difficulty dropdown menu rect.
         dropdown_left = self.menu_bar_rect.left
@@ -90,7 +98,7 @@ class Gui:
         # Create custom diff menu rect.
         custom_left = self.dropdown_rect.right
         custom_top = dropdown_top
-        custom_width = 110
+        custom_width = 160
         custom_height = dropdown_height
         self.custom_rect = pygame.Rect(custom_left, custom_top, custom_width,
             custom_height)
@@ -141,6 +149,7 @@ class Gui:
         """Draw given rects with given color."""
         for one_rect in all_rects:
             self.screen.fill(one_rect[1], rect=one_rect[0])
+            self.mines_game.dirty_rects.add(one_rect[0])
         
         # Create and draw restart_button.
         self.restart_button = RestartButton(self.mines_game)
@@ -156,6 +165,7 @@ class Gui:
         rect_lines(self.mines_game, self.mines_left_rect, self.screen, thickness=3)  # lines for mines_left_rect
         rect_lines(self.mines_game, self.time_rect, self.screen, thickness=3)        # lines for time_rect
         rect_lines(self.mines_game, self.big_rect, self.screen, inside=True, invert=True)
+        self.mines_game.dirty_rects.add(self.big_rect)     # all lines are inside big_rect
         
     def show_menu_buttons(self, difficulty=False, highscores=False, clicked=False):
         """Create menu buttons"""
@@ -180,6 +190,7 @@ class Gui:
             diff_text_rect.center = self.diff_rect.center
             diff_text_rect.y += 1
             self.screen.blit(diff_text, diff_text_rect)
+            self.mines_game.dirty_rects.add(self.diff_rect)
         
         # Highscores button
         if highscores:
@@ -194,6 +205,7 @@ class Gui:
             sb_text_rect.center = self.scoreboard_rect.center
             sb_text_rect.y += 1
             self.screen.blit(sb_text, sb_text_rect)
+            self.mines_game.dirty_rects.add(self.scoreboard_rect)
     
     def show_mines_left(self, num):
         """Writes number of mines that yet needs to be discovered to the 
@@ -215,7 +227,9 @@ class Gui:
         self.screen.blit(mines_bg_text, mines_bg_text_rect)
         
         self.screen.blit(text, text_rect)
+        self.mines_game.dirty_rects.add(self.mines_left_rect)
         
+    @profiler.timed('Gui.show_time')
     def show_time(self, time_left):
         """Show time_left in time_rect."""
         # background numbers
@@ -233,4 +247,5 @@ class Gui:
         text = self.font.render(time_left, True, self.bright_red)
         text_rect = text.get_rect()
         text_rect.center = self.time_rect.center
-        self.screen.blit(text, text_rect)
\ No newline at end of file
+        self.screen.blit(text, text_rect)
+        self.mines_game.dirty_rects.add(self.time_rect)
\ No newline at end of file
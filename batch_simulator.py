@@ -0,0 +1,149 @@
+import argparse
+import csv
+import json
+import os
+from multiprocessing import Pool
+from random import Random
+from time import perf_counter
+
+from bitboard import BitBoard
+from engine import Board
+from players import PLAYERS, play_game
+from settings import Settings
+
+DIFFICULTIES = ('beginner', 'intermediate', 'expert', 'custom')
+RESULT_FIELDS = ('difficulty', 'columns', 'rows', 'mines', 'seed', 'player',
+    'won', 'clicks', 'duration')
+
+def get_player_seed(seed):
+    """Return seed for the player of game with given seed. Board and player
+    mustn't share the same seed, otherwise their random streams would be
+    correlated and so would be the first click with placement of mines."""
+    return Random(seed).getrandbits(32)
+
+def create_game(columns, rows, mines, player_name, seed, bitboard=False):
+    """Return tuple (board, player) for one game with given seed."""
+    board_class = BitBoard if bitboard else Board
+    board = board_class(columns, rows, mines, seed=seed)
+    player = PLAYERS[player_name](get_player_seed(seed))
+    return board, player
+
+def simulate_game(task):
+    """Play one game described by task tuple (difficulty, columns, rows,
+    mines, player name, seed, True for bitboard.BitBoard) and return
+    dictionary with its result."""
+    difficulty, columns, rows, mines, player_name, seed, bitboard = task
+    start = perf_counter()
+    board, player = create_game(columns, rows, mines, player_name, seed,
+        bitboard)
+    clicks = play_game(board, player)
+    duration = perf_counter() - start
+    
+    return {
+        'difficulty': difficulty,
+        'columns': columns,
+        'rows': rows,
+        'mines': mines,
+        'seed': seed,
+        'player': player_name,
+        'won': board.is_won(),
+        'clicks': clicks,
+        'duration': duration,
+    }
+
+def generate_tasks(boards, games, player_name, base_seed, bitboard=False):
+    """Yield one task for each game. boards is list of tuples (difficulty,
+    columns, rows, mines). Tasks are generated lazily, so even huge number
+    of games doesn't need to fit into memory."""
+    for difficulty, columns, rows, mines in boards:
+        for game_num in range(games):
+            seed = (base_seed + game_num) % 2**32
+            yield difficulty, columns, rows, mines, player_name, seed, bitboard
+
+def get_boards(args):
+    """Return list of tuples (difficulty, columns, rows, mines) that should
+    be played according to command line arguments."""
+    boards = []
+    for difficulty in args.difficulty:
+        if difficulty == 'custom':
+            if None in (args.columns, args.rows, args.mines):
+                raise SystemExit('Custom difficulty needs --columns, --rows and --mines.')
+            boards.append((difficulty, args.columns, args.rows, args.mines))
+        else:
+            settings = Settings(diff=difficulty)
+            boards.append((difficulty, settings.columns, settings.rows,
+                settings.mines))
+    return boards
+
+class ResultWriter:
+    """Class writing results of games one by one to JSON lines or CSV
+    file."""
+    def __init__(self, file, file_format):
+        """Initialize writer for given open file. file_format is either
+        'jsonl' or 'csv'."""
+        self.file = file
+        self.file_format = file_format
+        if file_format == 'csv':
+            self.csv_writer = csv.DictWriter(file, fieldnames=RESULT_FIELDS)
+            self.csv_writer.writeheader()
+    
+    def write(self, result):
+        """Write result of one game."""
+        if self.file_format == 'csv':
+            self.csv_writer.writerow(result)
+        else:
+            self.file.write(json.dumps(result) + '\n')
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Play many games of '
+        'minesweeper with automated player and save their results.')
+    parser.add_argument('-n', '--games', type=int, default=1000,
+        help='number of games per difficulty')
+    parser.add_argument('-d', '--difficulty', nargs='+', choices=DIFFICULTIES,
+        default=['beginner', 'intermediate', 'expert'])
+    parser.add_argument('--columns', type=int, help='columns of custom board')
+    parser.add_argument('--rows', type=int, help='rows of custom board')
+    parser.add_argument('--mines', type=int, help='mines of custom board')
+    parser.add_argument('-p', '--player', choices=sorted(PLAYERS),
+        default='random')
+    parser.add_argument('-j', '--processes', type=int, default=os.cpu_count(),
+        help='number of worker processes')
+    parser.add_argument('--chunk-size', type=int, default=256,
+        help='number of games sent to a worker at once')
+    parser.add_argument('--seed', type=int, default=0,
+        help='seed of the first game, next games use following seeds')
+    parser.add_argument('--bitboard', action='store_true',
+        help='keep state of boards in bitboards instead of bytearrays')
+    parser.add_argument('-o', '--output', default='results.jsonl',
+        help='output file; .csv extension means CSV, otherwise JSON lines')
+    parser.add_argument('--format', choices=('jsonl', 'csv'),
+        help='output format (guessed from output file by default)')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Run the batch simulation."""
+    args = parse_args(argv)
+    boards = get_boards(args)
+    file_format = args.format
+    if file_format is None:
+        file_format = 'csv' if args.output.endswith('.csv') else 'jsonl'
+    
+    tasks = generate_tasks(boards, args.games, args.player, args.seed,
+        args.bitboard)
+    wins = 0
+    games = 0
+    start = perf_counter()
+    with open(args.output, 'w', newline='') as file, Pool(args.processes) as pool:
+        writer = ResultWriter(file, file_format)
+        for result in pool.imap_unordered(simulate_game, tasks, args.chunk_size):
+            writer.write(result)
+            games += 1
+            wins += result['won']
+    
+    duration = perf_counter() - start
+    print(f'{games} games ({wins} won) in {duration:.1f} s, '
+        f'{games / max(duration, 1e-9):.0f} games/s')
+
+if __name__ == '__main__':
+    main()
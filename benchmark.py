@@ -0,0 +1,228 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tracemalloc
+from statistics import median
+from time import perf_counter
+
+# Benchmarks run without window.
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+
+from engine import Board
+from minesweeper import Minesweeper
+from settings import Settings
+
+# Benchmarked boards (name: (columns, rows, mines)). Bigger boards have the
+# same density of mines as expert.
+BOARDS = {
+    'beginner': (9, 9, 10),
+    'expert': (30, 16, 99),
+    'maximum': (60, 30, 371),
+    'oversized': (200, 100, 4125),
+}
+
+# Boards whose memory per box is measured.
+MEMORY_BOARDS = {
+    'maximum': BOARDS['maximum'],
+    'huge': (1000, 1000, 206250),
+}
+
+DEFAULT_BASELINE = 'benchmark_baseline.json'
+
+def create_game(columns, rows, mines, game=None):
+    """Return Minesweeper game with window for board of given size."""
+    if game is None:
+        game = Minesweeper()
+    game.settings = Settings(diff='custom')
+    game.settings.columns = columns
+    game.settings.rows = rows
+    game.settings.mines = mines
+    game.custom_settings = {'columns': columns, 'rows': rows, 'mines': mines}
+    game.__init__(first_init=False)
+    game.prep_new_game()
+    return game
+
+def flood_board(game):
+    """Return board whose mines fill the last boxes, so uncovering the first
+    box uncovers nearly whole board (the worst case for flood fill)."""
+    board = Board.from_settings(game.settings)
+    board.set_mines(range(board.size - board.mines, board.size), board.seed)
+    return board
+
+def time_call(func, setup=None, repeats=5):
+    """Call func repeats times and return dictionary with the shortest and
+    median duration in milliseconds. setup is called (not timed) before
+    every call and its result is passed to func."""
+    durations = []
+    for _ in range(repeats):
+        arg = setup() if setup is not None else None
+        start = perf_counter()
+        func(arg)
+        durations.append((perf_counter() - start) * 1000)
+    return {'min_ms': min(durations), 'median_ms': median(durations)}
+
+def benchmark_board(game, repeats):
+    """Run all benchmarks on board of game's size. Returns dictionary
+    (benchmark name: timings)."""
+    grid = game.body_grid
+    results = {}
+
+    def new_board(arg=None):
+        game.board = Board.from_settings(game.settings)
+        return game.board
+
+    # Field creates boxes lazily, so creating it alone would measure nothing;
+    # every visible box is accessed once instead.
+    results['access_field_of_boxes'] = time_call(
+        lambda board: [box for row in grid.create_field_of_boxes()
+            for box in row], new_board, repeats)
+    field = game.field_of_boxes = grid.create_field_of_boxes()
+    visible_idxs = grid.get_visible_indexes()
+    first_box = grid.get_box(visible_idxs[len(visible_idxs) // 2])
+    results['set_up_mines'] = time_call(
+        lambda board: grid.set_up_mines(field, first_box), new_board, repeats)
+    results['check_adj_boxes'] = time_call(
+        lambda board: grid.check_adj_boxes(field), None, repeats)
+
+    def prep_flood(arg=None):
+        game.prep_new_game(flood_board(game))
+        return game.body_grid.get_box(0).center
+    results['flood_click'] = time_call(game._uncover_clicked_box, prep_flood,
+        repeats)
+
+    def prep_won(arg=None):
+        game._uncover_clicked_box(prep_flood())
+    results['check_winning'] = time_call(lambda arg: game.check_winning(),
+        prep_won, repeats)
+
+    results['hide_all_boxes'] = time_call(
+        lambda arg: grid.hide_all_boxes(game.field_of_boxes), None, repeats)
+
+    screen_rect = game.screen.get_rect()
+    def full_redraw(board):
+        game.window.fill_bg()
+        game.prep_new_game(board)
+        pygame.display.update(game.dirty_rects.pop_rects(screen_rect))
+    results['full_redraw'] = time_call(full_redraw,
+        lambda: Board.from_settings(game.settings), repeats)
+    return results
+
+def measure_memory(game):
+    """Return number of bytes per box which stay allocated after new game
+    is prepared and one box is uncovered, as measured by tracemalloc."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        game.prep_new_game()
+        game._uncover_clicked_box(game.body_rect.center)
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    return allocated / game.board.size
+
+def run_benchmarks(board_names, repeats):
+    """Run benchmarks on given boards. Returns dictionary ready to be saved
+    as JSON."""
+    game = None
+    results = {}
+    for name in board_names:
+        game = create_game(*BOARDS[name], game=game)
+        results[name] = benchmark_board(game, repeats)
+    return {
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'platform': platform.platform(),
+        'repeats': repeats,
+        'boards': {name: BOARDS[name] for name in board_names},
+        'results': results,
+    }
+
+def compare(results, baseline, threshold, min_difference=0.1):
+    """Compare median timings with baseline. Returns list of strings
+    describing regressions, which are slowdowns by more than threshold
+    (0.25 means 25 %) and more than min_difference milliseconds."""
+    regressions = []
+    for board_name, benchmarks in results['results'].items():
+        baseline_benchmarks = baseline['results'].get(board_name, {})
+        for name, timings in benchmarks.items():
+            if name not in baseline_benchmarks:
+                continue
+            old = baseline_benchmarks[name]['median_ms']
+            new = timings['median_ms']
+            if new > old * (1 + threshold) and new - old > min_difference:
+                regressions.append(f'{board_name} {name}: {old:.3f} ms -> '
+                    f'{new:.3f} ms ({(new / old - 1) * 100:+.0f} %)')
+    return regressions
+
+def print_results(results):
+    """Print table of median timings."""
+    for board_name, benchmarks in results['results'].items():
+        columns, rows, mines = results['boards'][board_name]
+        print(f'{board_name} ({columns}x{rows}, {mines} mines)')
+        for name, timings in benchmarks.items():
+            print(f"    {name:<24}{timings['median_ms']:10.3f} ms"
+                f"  (min {timings['min_ms']:.3f} ms)")
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Measure speed of setting '
+        'up, playing and drawing boards of minesweeper.')
+    parser.add_argument('-b', '--boards', nargs='+', choices=list(BOARDS),
+        default=list(BOARDS))
+    parser.add_argument('-r', '--repeats', type=int, default=5,
+        help='number of runs of every benchmark')
+    parser.add_argument('-o', '--output', default='benchmark.json',
+        help='file to write results to')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+        help='results to compare with')
+    parser.add_argument('--threshold', type=float, default=0.25,
+        help='allowed slowdown against baseline (0.25 means 25 %%)')
+    parser.add_argument('--save-baseline', action='store_true',
+        help='save results as new baseline instead of comparing')
+    parser.add_argument('--memory', action='store_true',
+        help='only measure memory per box of maximum and 1000x1000 board')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Run benchmarks. Returns exit code, which is 1 on regression."""
+    args = parse_args(argv)
+    if args.memory:
+        game = None
+        for name, size in MEMORY_BOARDS.items():
+            game = create_game(*size, game=game)
+            print(f'{name} ({size[0]}x{size[1]}): '
+                f'{measure_memory(game):.1f} bytes per box')
+        return 0
+
+    results = run_benchmarks(args.boards, args.repeats)
+    print_results(results)
+    with open(args.output, 'w') as file:
+        json.dump(results, file, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as file:
+            json.dump(results, file, indent=2)
+        print(f'Baseline saved to {args.baseline}.')
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f'No baseline {args.baseline} to compare with; run with '
+            '--save-baseline to create one.')
+        return 0
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    regressions = compare(results, baseline, args.threshold)
+    for regression in regressions:
+        print(f'Regression: {regression}')
+    if regressions:
+        return 1
+    print(f'No regressions against {args.baseline}.')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,215 @@
+from array import array
+
+from board_format import pack_bits
+from engine import Board
+from neighbor_index import get_neighbor_index
+
+class _BitStates:
+    """Read-only view of bits of BitBoard, indexed by flat index like
+    bytearrays of engine.Board."""
+    def __init__(self, board, name, inverted=False):
+        """Initialize view of board's attribute name. If inverted is True,
+        view says 1 where the bit isn't set."""
+        self.board = board
+        self.name = name
+        self.inverted = inverted
+
+    def __len__(self):
+        return self.board.size
+
+    def __iter__(self):
+        return (self[idx] for idx in range(self.board.size))
+
+    def __getitem__(self, idx):
+        board = self.board
+        bits = getattr(board, self.name) >> (idx + idx // board.columns)
+        return (bits & 1) ^ self.inverted
+
+class BitBoard(Board):
+    """Board keeping mines, uncovered and marked boxes as Python ints, one
+    bit per box. Each row takes columns + 1 bits; the extra bit is always
+    empty, so whole rows can be shifted to get neighbors without boxes
+    wrapping around to the other edge. Checking win or wrong marks is one
+    bitwise operation and a copy of the game state is just a few ints,
+    which makes it good for simulations and search. Reading single box is
+    slower than from bytearray, so it suits smaller boards."""
+    def __init__(self, columns, rows, mines, safe_zone='neighbors', seed=None,
+        use_numpy=True):
+        """Initialize board with all boxes covered. Mines are placed on the
+        first uncovered box, or by calling place_mines."""
+        self.columns = columns
+        self.rows = rows
+        self.mines = mines
+        self.safe_zone = safe_zone
+        self.seed = seed
+        self.use_numpy = use_numpy
+        self.neighbor_index = get_neighbor_index(columns, rows)
+        self.size = self.neighbor_index.size
+        self.stride = columns + 1       # bits per row
+        # Bits of all boxes; columns bits repeated in every row.
+        self.all_cells = (((1 << columns) - 1) * ((1 << self.stride * rows) - 1)
+            // ((1 << self.stride) - 1))
+
+        # State of boxes. Counts of adjacent mines don't change during the
+        # game, so they're kept in bytearray.
+        self.mine_bits = 0
+        self.revealed_bits = 0
+        self.flag_bits = 0
+        self.empty_bits = 0             # boxes without mine and adjacent mines
+        self.adjacent_mines = bytearray(self.size)
+        self.mine_idxs = array('i')
+        self.first_idx = None
+        self._create_views()
+
+        # Game state.
+        self.mines_placed = False
+        self.lost = False
+        self.exploded_idx = None
+
+    def _create_views(self):
+        """Create views which make bits readable like bytearrays."""
+        self.has_mine = _BitStates(self, 'mine_bits')
+        self.covered = _BitStates(self, 'revealed_bits', inverted=True)
+        self.marked = _BitStates(self, 'flag_bits')
+
+    @property
+    def marks(self):
+        return self.flag_bits.bit_count()
+
+    @property
+    def correct_marks(self):
+        return (self.flag_bits & self.mine_bits).bit_count()
+
+    @property
+    def covered_safe_boxes(self):
+        return self.size - self.mines - (self.revealed_bits & ~self.mine_bits).bit_count()
+
+    def to_bit(self, idx):
+        """Convert flat index to number of its bit."""
+        return idx + idx // self.columns
+
+    def to_bits(self, idxs):
+        """Return int with bits of boxes with given flat indexes set."""
+        flags = bytearray(self.stride * self.rows)
+        for idx in idxs:
+            flags[idx + idx // self.columns] = 1
+        return int.from_bytes(pack_bits(flags), 'little')
+
+    def to_indexes(self, bits):
+        """Return list of flat indexes of boxes whose bits are set."""
+        text = bin(bits)[:1:-1]         # character n is bit n
+        idxs = []
+        bit = text.find('1')
+        while bit >= 0:
+            idxs.append(bit - bit // self.stride)
+            bit = text.find('1', bit + 1)
+        return idxs
+
+    def spread(self, bits):
+        """Return bits with all their adjacent boxes set as well."""
+        row = bits | (bits << 1) | (bits >> 1)
+        return (row | (row << self.stride) | (row >> self.stride)) & self.all_cells
+
+    def set_mines(self, mine_idxs, seed=None):
+        """Place mines into boxes with given indexes and count adjacent mines
+        of every box."""
+        self.seed = seed
+        self.mine_idxs = array('i', mine_idxs)
+        self.mines = len(self.mine_idxs)
+        self.mine_bits = self.to_bits(self.mine_idxs)
+        self.empty_bits = self.all_cells & ~self.spread(self.mine_bits)
+        self.count_adjacent_mines()
+        self.mines_placed = True
+
+    def uncover(self, idx):
+        """Uncover box idx. If it doesn't have adjacent mines, all connected
+        boxes without adjacent mines are uncovered as well; the region grows
+        by whole board at once, one ring of boxes per step. Returns list of
+        indexes of uncovered boxes (empty if nothing was uncovered)."""
+        if not self.mines_placed:
+            self.place_mines(idx)
+
+        bit = 1 << self.to_bit(idx)
+        if self.revealed_bits & bit or self.is_over():
+            return []
+        if (self.first_idx is not None and idx != self.first_idx
+            and not self.revealed_bits):
+            # Mines were placed around first_idx, so the game starts there.
+            return []
+
+        if self.mine_bits & bit:
+            self.revealed_bits |= bit
+            self.lost = True
+            self.exploded_idx = idx
+            return [idx]
+
+        covered = self.all_cells & ~self.revealed_bits
+        region = bit
+        frontier = bit & self.empty_bits
+        while frontier:
+            grown = region | (self.spread(frontier) & covered)
+            frontier = grown & ~region & self.empty_bits
+            region = grown
+        self.revealed_bits |= region
+        # Wrongly marked boxes lose their marks.
+        self.flag_bits &= ~region
+        return self.to_indexes(region)
+
+    def mark(self, idx):
+        """Mark covered box idx as box with mine. Returns True if box was
+        marked."""
+        bit = 1 << self.to_bit(idx)
+        if (self.revealed_bits | self.flag_bits) & bit or self.lost:
+            return False
+        self.flag_bits |= bit
+        return True
+
+    def unmark(self, idx):
+        """Remove mark from box idx. Returns True if mark was removed."""
+        bit = 1 << self.to_bit(idx)
+        if not self.flag_bits & bit or self.lost:
+            return False
+        self.flag_bits &= ~bit
+        return True
+
+    def all_mines_marked(self):
+        """Return True if every mine is marked and there's no other mark."""
+        return self.mines_left() == 0 and self.flag_bits == self.mine_bits
+
+    def all_safe_uncovered(self):
+        """Return True if every box without mine is uncovered."""
+        return self.mines_placed and self.revealed_bits | self.mine_bits == self.all_cells
+
+    def uncovered_indexes(self):
+        """Return list of indexes of uncovered boxes."""
+        return self.to_indexes(self.revealed_bits)
+
+    def marked_indexes(self):
+        """Return list of indexes of marked boxes."""
+        return self.to_indexes(self.flag_bits)
+
+    def wrongly_marked(self):
+        """Return list of indexes of marked boxes without mine."""
+        return self.to_indexes(self.flag_bits & ~self.mine_bits)
+
+    def unmarked_mines(self):
+        """Return list of indexes of boxes with mine that aren't marked."""
+        return self.to_indexes(self.mine_bits & ~self.flag_bits)
+
+    def get_state(self):
+        """Return state of the game, which can be set back by set_state (to
+        undo moves or to try them out)."""
+        return self.revealed_bits, self.flag_bits, self.lost, self.exploded_idx
+
+    def set_state(self, state):
+        """Return the game to state returned by get_state."""
+        self.revealed_bits, self.flag_bits, self.lost, self.exploded_idx = state
+
+    def copy(self):
+        """Return copy of the board. Bits are immutable ints and adjacent
+        mines don't change once mines are placed, so nothing is copied
+        except references."""
+        board = object.__new__(type(self))
+        board.__dict__.update(self.__dict__)
+        board._create_views()
+        return board
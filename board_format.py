@@ -0,0 +1,95 @@
+import struct
+
+from engine import Board
+
+# Header of serialized board: magic, version, flags, columns, rows, mines,
+# seed, first clicked box (-1 if there's none) and safe zone.
+HEADER = struct.Struct('<4sBBHHIQiB')
+MAGIC = b'MSWB'
+VERSION = 1
+HAS_MINES = 1       # flag telling that header is followed by mine bitmap
+MINES_PLACED = 2    # flag telling that mines of the board were placed
+HAS_SEED = 4        # flag telling that seed is stored (otherwise it's None)
+
+SAFE_ZONES = ('cell', 'neighbors')
+
+_to_chars = bytes.maketrans(b'\x00\x01', b'01')
+_to_flags = bytes.maketrans(b'01', b'\x00\x01')
+
+def pack_bits(flags):
+    """Pack bytearray of 0/1 flags into bytes, 8 flags per byte. Flag with
+    index i is bit i % 8 of byte i // 8."""
+    if not flags:
+        return b''
+    bits = bytes(flags).translate(_to_chars)[::-1]
+    return int(bits, 2).to_bytes((len(flags) + 7) // 8, 'little')
+
+def unpack_bits(data, size):
+    """Unpack size flags packed by pack_bits into bytearray."""
+    if size == 0:
+        return bytearray()
+    bits = format(int.from_bytes(data, 'little'), f'0{size}b')
+    return bytearray(bits[::-1].encode().translate(_to_flags))
+
+def encode_board(board, include_mines=True):
+    """Return board's dimensions, seed and mines packed into bytes. Without
+    mines the board can still be created again from its seed, but it takes
+    longer. Board whose mines weren't placed yet is stored without them."""
+    first_idx = board.first_idx if board.first_idx is not None else -1
+    flags = 0
+    if board.mines_placed:
+        flags |= MINES_PLACED
+        if include_mines:
+            flags |= HAS_MINES
+        elif board.seed is None:
+            raise ValueError("Board without seed can't be stored without mines.")
+    seed = 0
+    if board.seed is not None:
+        flags |= HAS_SEED
+        seed = board.seed
+    header = HEADER.pack(MAGIC, VERSION, flags, board.columns, board.rows,
+        board.mines, seed, first_idx, SAFE_ZONES.index(board.safe_zone))
+    if flags & HAS_MINES:
+        return header + pack_bits(board.has_mine)
+    return header
+
+def decode_header(data):
+    """Return dictionary with dimensions, seed, first clicked box and safe
+    zone of serialized board."""
+    (magic, version, flags, columns, rows, mines, seed, first_idx,
+        safe_zone) = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('Data are not a serialized minesweeper board.')
+    return {
+        'columns': columns,
+        'rows': rows,
+        'mines': mines,
+        'seed': seed if flags & HAS_SEED else None,
+        'first_idx': first_idx if first_idx >= 0 else None,
+        'safe_zone': SAFE_ZONES[safe_zone],
+        'has_mines': bool(flags & HAS_MINES),
+        'mines_placed': bool(flags & MINES_PLACED),
+    }
+
+def decode_board(data):
+    """Create Board from bytes made by encode_board. Mines are placed only
+    if they were placed in the encoded board."""
+    header = decode_header(data)
+    board = Board(header['columns'], header['rows'], header['mines'],
+        header['safe_zone'], header['seed'])
+    if header['has_mines']:
+        has_mine = unpack_bits(data[HEADER.size:], board.size)
+        board.first_idx = header['first_idx']
+        board.set_mines([idx for idx, mine in enumerate(has_mine) if mine],
+            header['seed'])
+    elif header['mines_placed']:
+        # Only seed was stored, so mines are placed the same way again.
+        board.place_mines(header['first_idx'], header['seed'])
+    return board
+
+def board_size(data):
+    """Return number of bytes taken by serialized board at start of data."""
+    flags, columns, rows = HEADER.unpack_from(data)[2:5]
+    if flags & HAS_MINES:
+        return HEADER.size + (columns * rows + 7) // 8
+    return HEADER.size
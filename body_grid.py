@@ -1,83 +1,237 @@
-from random import choice
-
 import pygame
 
 from box import Box
+from box_overlay import get_overlay_tile
+
+class BoxField():
+    """Rows of boxes visible in body_rect. Boxes aren't kept; each row is
+    created when it's asked for, so the field always shows the current
+    viewport and takes no memory per box."""
+    def __init__(self, grid):
+        """Initialize field of given grid."""
+        self.grid = grid
+    
+    def __len__(self):
+        return self.grid.view_rows
+    
+    def __getitem__(self, row_num):
+        """Return list of boxes in row_num-th visible row."""
+        if not 0 <= row_num < self.grid.view_rows:
+            raise IndexError('row of boxes out of view')
+        return self.grid._create_row_of_boxes(self.grid.view_top + row_num)
 
 class Grid():
-    """Class for grid in body_rect where the actual game takes place."""
+    """Class for grid in body_rect where the actual game takes place. Board
+    can be bigger than body_rect; then only part of it (viewport) is shown
+    and it can be panned. Boxes exist only for visible part of the board,
+    state of all boxes is kept by the board."""
     def __init__(self, mines_game):
         """Initialize all that's necessary."""
         self.body_rect = mines_game.body_rect
         self.mines_game = mines_game
         self.screen = mines_game.screen
         self.settings = mines_game.settings
+        
+        # Viewport; number of visible columns and rows and position of its
+        # top left box on the board.
+        self.view_columns = self.body_rect.width // self.settings.box_width
+        self.view_rows = self.body_rect.height // self.settings.box_height
+        self.view_left = 0
+        self.view_top = 0
+        self.drag_start = None      # (mouse_pos, view_left, view_top) when dragging
     
-    def _create_row_of_boxes(self, box_top):
-        """Create a single row of gaming boxes in body rect."""
-        box_num = 0
+    def _create_row_of_boxes(self, row_num):
+        """Create a single row of visible gaming boxes in body rect."""
         row_of_boxes = []
-        for box in range(self.settings.columns):   # box is rect
-            box = Box(self.mines_game)
-            box.left = self.body_rect.left + (box.width * box_num)
-            box.top = box_top
-            row_of_boxes.append(box)
-            box_num += 1
+        for column in range(self.view_left, self.view_left + self.view_columns):
+            row_of_boxes.append(self.get_box(row_num * self.settings.columns + column))
         
         return row_of_boxes
     
     def create_field_of_boxes(self):
-        """Creates whole field of gaming boxes."""
-        row_num = 0
-        field_of_boxes = []
-        for row in range(self.settings.rows):
-            box_top = self.body_rect.top + (self.settings.box_height * row_num)
-            row = self._create_row_of_boxes(box_top)
-            field_of_boxes.append(row)
-            row_num += 1
+        """Creates field of gaming boxes visible in body_rect. Boxes are
+        created from the board when the field is iterated over."""
+        return BoxField(self)
+    
+    def get_box(self, idx):
+        """Return Box with flat index idx placed in body_rect or None if the
+        box isn't visible."""
+        row, column = divmod(idx, self.settings.columns)
+        column -= self.view_left
+        row -= self.view_top
+        if not (0 <= column < self.view_columns and 0 <= row < self.view_rows):
+            return None
         
-        return field_of_boxes
+        box = Box(self.mines_game)
+        box.left = self.body_rect.left + column * self.settings.box_width
+        box.top = self.body_rect.top + row * self.settings.box_height
+        box.index = idx
+        return box
+    
+    def get_visible_indexes(self):
+        """Return list of flat indexes of visible boxes."""
+        columns = self.settings.columns
+        return [row * columns + column
+            for row in range(self.view_top, self.view_top + self.view_rows)
+            for column in range(self.view_left, self.view_left + self.view_columns)]
+    
+    def get_box_position(self, mouse_pos):
+        """Return (row, column) of box under mouse_pos or None if mouse_pos is
+        outside of the grid. Grid is regular, so no box needs to be checked."""
+        x = mouse_pos[0] - self.body_rect.left
+        y = mouse_pos[1] - self.body_rect.top
+        if x < 0 or y < 0:
+            return None
         
+        column = x // self.settings.box_width
+        row = y // self.settings.box_height
+        if column >= self.view_columns or row >= self.view_rows:
+            return None
+        return row + self.view_top, column + self.view_left
+    
+    def get_box_index(self, mouse_pos):
+        """Return flat index of box under mouse_pos or None."""
+        position = self.get_box_position(mouse_pos)
+        if position is None:
+            return None
+        return position[0] * self.settings.columns + position[1]
+    
+    def get_clicked_box(self, mouse_pos):
+        """Return box under mouse_pos or None."""
+        idx = self.get_box_index(mouse_pos)
+        if idx is None:
+            return None
+        return self.get_box(idx)
+    
     def hide_all_boxes(self, field_of_boxes):
-        """For every box in field_of_boxes create overlay."""
-        list_of_overlays = []
-        for row in field_of_boxes:
-            for box in row:
-                overlay = box.create_overlay()
-                list_of_overlays.append(overlay)
-        
-        return list_of_overlays
-        
-    def set_up_mines(self, field_of_boxes):
-        """Place mines to field of boxes."""
-        boxes_with_mines = []
-        for num in range(self.settings.mines):
-            while True:
-                # Pick a random box.
-                random_row = choice(field_of_boxes)
-                random_box = choice(random_row)
-                
-                if random_box.has_mine or random_box == field_of_boxes[0][0]:
-                    # Box already has a mine or it is first box in first row;
-                    # pick another one.
-                    continue
-                else:
-                    # Box doesn't have mine, so place one there.
-                    random_box.has_mine = True
-                    boxes_with_mines.append(random_box)
-                
-                break
-        return boxes_with_mines
+        """Draw overlay over every box in field_of_boxes. All overlays share
+        the same image, so only the first row is drawn box by box and then
+        it's copied to the other rows. No box needs to be created."""
+        tile = get_overlay_tile(self.mines_game, self.settings.bg_color)
+        left, top = self.body_rect.topleft
+        height = self.settings.box_height
+        self.screen.blits([(tile, (left + column * self.settings.box_width, top))
+            for column in range(self.view_columns)], doreturn=False)
+        first_row = pygame.Rect(left, top, self.body_rect.width, height)
+        self.screen.blits([(self.screen, (left, top + row * height), first_row)
+            for row in range(1, len(field_of_boxes))], doreturn=False)
+        self.mines_game.dirty_rects.add(self.body_rect)
+    
+    def draw_boxes(self, idxs=None):
+        """Draw visible boxes (or only given ones, if they are visible)
+        according to state of the board."""
+        if idxs is None:
+            idxs = self.get_visible_indexes()
+        for idx in idxs:
+            box = self.get_box(idx)
+            if box is not None:
+                box.draw()
+        self.mines_game.dirty_rects.add(self.body_rect)
+    
+    def reset_view(self):
+        """Show top left part of the board (or middle of endless board, so it
+        can be panned to all sides)."""
+        self.view_left = 0
+        self.view_top = 0
+        if self.mines_game.board.endless:
+            self.view_left = (self.settings.columns - self.view_columns) // 2
+            self.view_top = (self.settings.rows - self.view_rows) // 2
+        self.drag_start = None
+    
+    def pan(self, d_columns, d_rows):
+        """Move viewport by given number of columns and rows. Already drawn
+        boxes are moved on screen, so only the boxes which come into view are
+        drawn. Returns True if viewport moved."""
+        view_left = min(max(self.view_left + d_columns, 0),
+            self.settings.columns - self.view_columns)
+        view_top = min(max(self.view_top + d_rows, 0),
+            self.settings.rows - self.view_rows)
+        d_columns = view_left - self.view_left
+        d_rows = view_top - self.view_top
+        if not d_columns and not d_rows:
+            return False
+        self.view_left = view_left
+        self.view_top = view_top
         
+        if abs(d_columns) >= self.view_columns or abs(d_rows) >= self.view_rows:
+            self.draw_boxes()
+        else:
+            body_surface = self.screen.subsurface(self.body_rect)
+            body_surface.scroll(-d_columns * self.settings.box_width,
+                -d_rows * self.settings.box_height)
+            
+            # Draw columns and rows which came into view.
+            columns = range(view_left, view_left + self.view_columns)
+            rows = range(view_top, view_top + self.view_rows)
+            new_columns = columns[-d_columns:] if d_columns > 0 else columns[:-d_columns]
+            new_rows = rows[-d_rows:] if d_rows > 0 else rows[:-d_rows]
+            idxs = {row * self.settings.columns + column
+                for row in rows for column in new_columns}
+            idxs.update(row * self.settings.columns + column
+                for row in new_rows for column in columns)
+            self.draw_boxes(idxs)
+        return True
+    
+    def scroll_to(self, idx):
+        """Pan viewport so that box idx is visible. Returns True if viewport
+        moved."""
+        row, column = divmod(idx, self.settings.columns)
+        d_columns = 0
+        d_rows = 0
+        if column < self.view_left:
+            d_columns = column - self.view_left
+        elif column >= self.view_left + self.view_columns:
+            d_columns = column - (self.view_left + self.view_columns - 1)
+        if row < self.view_top:
+            d_rows = row - self.view_top
+        elif row >= self.view_top + self.view_rows:
+            d_rows = row - (self.view_top + self.view_rows - 1)
+        return self.pan(d_columns, d_rows)
+    
+    def start_drag(self, mouse_pos):
+        """Start panning viewport by dragging mouse."""
+        self.drag_start = (mouse_pos, self.view_left, self.view_top)
+    
+    def drag(self, mouse_pos):
+        """Pan viewport so that the dragged point of board stays under mouse."""
+        if self.drag_start is None:
+            return
+        start_pos, start_left, start_top = self.drag_start
+        d_columns = (start_pos[0] - mouse_pos[0]) // self.settings.box_width
+        d_rows = (start_pos[1] - mouse_pos[1]) // self.settings.box_height
+        self.pan(start_left + d_columns - self.view_left,
+            start_top + d_rows - self.view_top)
+    
+    def stop_drag(self):
+        """Stop panning viewport by dragging mouse."""
+        self.drag_start = None
+    
+    def set_up_mines(self, field_of_boxes, first_box=None, seed=None):
+        """Place mines to field of boxes. No mine will be placed into
+        first_box (the first clicked box) and, depending on settings.safe_zone,
+        into its adjacent boxes. If seed isn't given, settings.seed is used
+        and if that is None too, random one is picked. Used seed is stored
+        in self.seed, so the board can be created again. Returns list of
+        visible boxes with mines."""
+        board = self.mines_game.board
+        first_idx = first_box.index if first_box is not None else None
+        board.place_mines(first_idx, seed)
+        self.seed = board.seed
+        return self.get_boxes_with_mines()
+    
     def check_adj_boxes(self, field_of_boxes):
         """For each box checks how many mines are in adjacent boxes."""
-        for row in field_of_boxes:
-            for box in row:
-                box.get_adjacent_boxes(field_of_boxes)
-                box.count_adjacent_mines()
-                
+        self.mines_game.board.count_adjacent_mines()
+    
+    def get_boxes_with_mines(self):
+        """Return list of visible boxes with mines."""
+        has_mine = self.mines_game.board.has_mine
+        return [self.get_box(idx) for idx in self.get_visible_indexes()
+            if has_mine[idx]]
+    
     def uncover_left_boxes(self, field_of_boxes):
-        """Uncover all boxes that weren't uncovered yet."""
+        """Uncover all visible boxes that weren't uncovered yet. The rest is
+        drawn uncovered when panned into view, as the game is won."""
         for row in field_of_boxes:
             for box in row:
                 if box.covered and not box.marked :
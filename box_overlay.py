@@ -2,6 +2,27 @@ import pygame
 
 from draw_lines_around_rect import draw_lines_around_rect as rect_lines
 
+# Overlay images are the same for all boxes of the same size and color, so
+# each one is drawn only once. Key is (box size, color, outline colors).
+_tile_cache = {}
+
+def get_overlay_tile(mines_game, color):
+    """Return image of box overlay with given color. Returned surface is
+    shared, so it must not be drawn into."""
+    settings = mines_game.settings
+    key = (settings.box_width, settings.box_height, color,
+        settings.outline_white, settings.outline_grey)
+    surf = _tile_cache.get(key)
+    if surf is None:
+        surf = pygame.Surface((settings.box_width, settings.box_height))
+        surf.fill(color)
+        rect = surf.get_rect()
+        
+        # Draw grey and white lines around box.
+        rect_lines(mines_game, rect, surf, thickness=4, inside=True, invert=True)
+        _tile_cache[key] = surf
+    return surf
+
 class BoxOverlay(pygame.sprite.Sprite):
     """Class representing overlay for each box. This overlay will
     disappear after clicking on it with a mouse."""
@@ -15,13 +36,6 @@ class BoxOverlay(pygame.sprite.Sprite):
         self.rect = self.image.get_rect()
         
     def _create_image(self):
-        """Create proper image of box's overlay."""
-        surf = pygame.Surface((self.settings.box_width, self.settings.box_height))
-        surf.fill(self.color)
-        rect = surf.get_rect()
-        
-        # Draw grey and white lines around box.
-        rect_lines(self.mines_game, rect, surf, thickness=4, inside=True, invert=True)
-        
-        return surf
+        """Get proper image of box's overlay."""
+        return get_overlay_tile(self.mines_game, self.color)
         
\ No newline at end of file
@@ -0,0 +1,347 @@
+from collections import OrderedDict
+from random import Random, randrange
+
+from board_format import pack_bits, unpack_bits
+from mine_placement import get_safe_zone
+from neighbor_index import get_neighbor_index
+from reveal import flood_reveal
+
+# Chunks are squares of CHUNK_SIZE x CHUNK_SIZE boxes.
+CHUNK_SIZE = 32
+CHUNK_BOXES = CHUNK_SIZE * CHUNK_SIZE
+
+# Endless board has this many columns and rows. Panning through it at one
+# box per frame would take hours.
+ENDLESS_SIZE = 2**20
+
+MAX_CHUNKS = 256        # chunks kept in memory (about 4 kB each)
+MAX_REVEAL = 100000     # boxes uncovered by one click (or frame) at most
+
+class Chunk:
+    """Square part of ChunkedBoard. Its mines depend only on board's seed and
+    chunk's coordinates, so chunk can be thrown away and generated again."""
+    def __init__(self, has_mine):
+        """Initialize chunk with all boxes covered."""
+        self.has_mine = has_mine
+        self.adjacent_mines = None      # counted when first needed
+        self.covered = bytearray(b'\x01') * CHUNK_BOXES
+        self.marked = bytearray(CHUNK_BOXES)
+        self.touched = False            # some box was uncovered or marked
+
+class _BoxStates:
+    """Read-only view of one state of all boxes of ChunkedBoard, indexed by
+    flat index like bytearrays of engine.Board."""
+    def __init__(self, get_state):
+        """Initialize view; get_state takes flat index and returns state."""
+        self.get_state = get_state
+
+    def __getitem__(self, idx):
+        return self.get_state(idx)
+
+class ChunkedBoard:
+    """Board of minesweeper split into chunks which are generated when
+    they're first needed. Each chunk gets mines independently (density of
+    its boxes), so the board can be so big that it's practically endless.
+    Only MAX_CHUNKS recently used chunks are kept; the least recently used
+    one is dropped when another is needed. If it was played on, only its
+    covered and marked boxes are kept, packed to bits (marked ones only if
+    there are any). Chunks which were only looked at take no memory once
+    dropped, but those played on stay saved, so memory grows with area
+    uncovered by the player by about 300 bytes per chunk (1024 boxes), for
+    example 30 MB after 100000 chunks. Boxes are referenced
+    by flat index and the board has the same interface as engine.Board, so
+    the game, solver and players work with either. There's no total number
+    of mines, so the game can only be lost."""
+    endless = True
+
+    def __init__(self, columns=ENDLESS_SIZE, rows=ENDLESS_SIZE, density=0.16,
+        safe_zone='neighbors', seed=None, max_chunks=MAX_CHUNKS):
+        """Initialize board with all boxes covered. Mines can't be in
+        safe zone around the first uncovered box."""
+        self.columns = columns
+        self.rows = rows
+        self.density = density
+        self.safe_zone = safe_zone
+        self.seed = seed if seed is not None else randrange(2**32)
+        self.max_chunks = max_chunks
+        self.neighbor_index = get_neighbor_index(columns, rows)
+        self.size = self.neighbor_index.size
+        self.mines = 0                  # unknown; only marks are counted
+
+        # Chunks in order of use ((chunk column, chunk row): Chunk) and
+        # packed boxes of dropped chunks which were played on (key: tuple of
+        # packed covered and marked boxes, the latter empty without marks).
+        self.chunks = OrderedDict()
+        self.saved_chunks = {}
+        self.safe_idxs = set()
+
+        # State of boxes, indexed by flat index.
+        self.has_mine = _BoxStates(lambda idx: self._get_state(idx, 'has_mine'))
+        self.covered = _BoxStates(lambda idx: self._get_state(idx, 'covered'))
+        self.marked = _BoxStates(lambda idx: self._get_state(idx, 'marked'))
+        self.adjacent_mines = _BoxStates(self._get_adjacent_mines)
+        self.marked_idxs = set()
+        self.first_idx = None
+        # Uncovered empty boxes from which uncovering didn't spread yet, as
+        # one click uncovers at most MAX_REVEAL boxes.
+        self.unfinished = []
+
+        # Game state.
+        self.mines_placed = False
+        self.lost = False
+        self.exploded_idx = None
+        self.uncovered_boxes = 0
+        self.marks = 0
+
+    @classmethod
+    def from_settings(cls, settings, seed=None):
+        """Create board according to game settings."""
+        if seed is None:
+            seed = settings.seed
+        return cls(settings.columns, settings.rows, settings.endless_density,
+            settings.safe_zone, seed, settings.max_chunks)
+
+    def _locate(self, idx):
+        """Return tuple (chunk, index of box in chunk) of box idx."""
+        row, column = divmod(idx, self.columns)
+        chunk = self._get_chunk((column // CHUNK_SIZE, row // CHUNK_SIZE))
+        return chunk, (row % CHUNK_SIZE) * CHUNK_SIZE + column % CHUNK_SIZE
+
+    def _get_chunk(self, key):
+        """Return chunk with coordinates key, generating it if needed."""
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            self.chunks.move_to_end(key)
+            return chunk
+
+        chunk = Chunk(self._generate_mines(key))
+        saved = self.saved_chunks.pop(key, None)
+        if saved is not None:
+            covered, marked = saved
+            chunk.covered = unpack_bits(covered, CHUNK_BOXES)
+            if marked:
+                chunk.marked = unpack_bits(marked, CHUNK_BOXES)
+            chunk.touched = True
+        self.chunks[key] = chunk
+
+        while len(self.chunks) > self.max_chunks:
+            old_key, old_chunk = self.chunks.popitem(last=False)
+            if old_chunk.touched:
+                marked = b''
+                if any(old_chunk.marked):
+                    marked = pack_bits(old_chunk.marked)
+                self.saved_chunks[old_key] = (pack_bits(old_chunk.covered), marked)
+        return chunk
+
+    def _generate_mines(self, key):
+        """Return bytearray of mines of chunk with coordinates key. Mines
+        depend only on seed and key; none is placed outside of the board or
+        into safe zone."""
+        has_mine = bytearray(CHUNK_BOXES)
+        chunk_column, chunk_row = key
+        left = chunk_column * CHUNK_SIZE
+        top = chunk_row * CHUNK_SIZE
+        if left < 0 or top < 0 or left >= self.columns or top >= self.rows:
+            return has_mine
+
+        width = min(CHUNK_SIZE, self.columns - left)
+        height = min(CHUNK_SIZE, self.rows - top)
+        free = [row * CHUNK_SIZE + column for row in range(height)
+            for column in range(width)
+            if (top + row) * self.columns + left + column not in self.safe_idxs]
+        rng = Random(f'{self.seed}:{chunk_column}:{chunk_row}')
+        for offset in rng.sample(free, round(len(free) * self.density)):
+            has_mine[offset] = 1
+        return has_mine
+
+    def _count_adjacent_mines(self, key):
+        """Return bytearray of adjacent mines of boxes of chunk key. Mines of
+        adjacent chunks are generated if they aren't in memory, but those
+        chunks aren't kept."""
+        chunk_column, chunk_row = key
+        mines = {}
+        for d_row in (-1, 0, 1):
+            for d_column in (-1, 0, 1):
+                adj_key = (chunk_column + d_column, chunk_row + d_row)
+                adj_chunk = self.chunks.get(adj_key)
+                mines[(d_column, d_row)] = (adj_chunk.has_mine
+                    if adj_chunk is not None else self._generate_mines(adj_key))
+
+        # Mines of the chunk with one box wide border of adjacent chunks.
+        width = CHUNK_SIZE + 2
+        padded = bytearray(width * width)
+        for padded_row in range(width):
+            d_row, row = divmod(padded_row - 1, CHUNK_SIZE)
+            for padded_column in range(width):
+                d_column, column = divmod(padded_column - 1, CHUNK_SIZE)
+                padded[padded_row * width + padded_column] = (
+                    mines[(d_column, d_row)][row * CHUNK_SIZE + column])
+
+        counts = bytearray(CHUNK_BOXES)
+        for row in range(CHUNK_SIZE):
+            above = row * width
+            middle = above + width
+            below = middle + width
+            for column in range(CHUNK_SIZE):
+                counts[row * CHUNK_SIZE + column] = (
+                    padded[above + column] + padded[above + column + 1]
+                    + padded[above + column + 2] + padded[middle + column]
+                    + padded[middle + column + 2] + padded[below + column]
+                    + padded[below + column + 1] + padded[below + column + 2])
+        return counts
+
+    def _get_state(self, idx, name):
+        """Return state name ('has_mine', 'covered' or 'marked') of box idx."""
+        chunk, offset = self._locate(idx)
+        return getattr(chunk, name)[offset]
+
+    def _get_adjacent_mines(self, idx):
+        """Return number of adjacent mines of box idx."""
+        row, column = divmod(idx, self.columns)
+        key = (column // CHUNK_SIZE, row // CHUNK_SIZE)
+        chunk = self._get_chunk(key)
+        if chunk.adjacent_mines is None:
+            chunk.adjacent_mines = self._count_adjacent_mines(key)
+        return chunk.adjacent_mines[(row % CHUNK_SIZE) * CHUNK_SIZE
+            + column % CHUNK_SIZE]
+
+    def place_mines(self, first_idx=None, seed=None):
+        """Keep box first_idx and, depending on safe_zone, its adjacent boxes
+        without mines. Mines of chunks are placed when the chunks are
+        generated, so only chunks already in memory are generated again."""
+        if seed is not None:
+            self.seed = seed
+        self.first_idx = first_idx
+        if first_idx is not None:
+            self.safe_idxs = set(get_safe_zone(self.neighbor_index, first_idx,
+                self.safe_zone))
+        for key, chunk in self.chunks.items():
+            chunk.has_mine = self._generate_mines(key)
+            chunk.adjacent_mines = None
+        self.mines_placed = True
+
+    def uncover(self, idx):
+        """Uncover box idx. If it doesn't have adjacent mines, all connected
+        boxes without adjacent mines are uncovered as well (at most
+        MAX_REVEAL boxes; the rest is uncovered by continue_reveal). Returns
+        list of indexes of uncovered boxes."""
+        if not self.mines_placed:
+            self.place_mines(idx)
+
+        chunk, offset = self._locate(idx)
+        if not chunk.covered[offset] or self.lost:
+            return []
+        if chunk.has_mine[offset]:
+            chunk.covered[offset] = 0
+            chunk.touched = True
+            self.lost = True
+            self.exploded_idx = idx
+            # Nothing more is uncovered after the game is lost.
+            self.unfinished.clear()
+            return [idx]
+
+        uncovered_idxs = self._flood_reveal(idx, MAX_REVEAL)
+        self._set_uncovered(uncovered_idxs)
+        return uncovered_idxs
+
+    def continue_reveal(self, limit=MAX_REVEAL):
+        """Continue uncovering from unfinished boxes, at most limit boxes.
+        Returns list of indexes of uncovered boxes."""
+        uncovered_idxs = []
+        while self.unfinished and len(uncovered_idxs) < limit:
+            start = self.unfinished.pop()
+            # Start box itself is already uncovered.
+            revealed = self._flood_reveal(start, limit - len(uncovered_idxs))[1:]
+            self._set_uncovered(revealed)
+            uncovered_idxs.extend(revealed)
+        return uncovered_idxs
+
+    def _flood_reveal(self, idx, limit):
+        """Return indexes of boxes uncovered by spreading from box idx,
+        keeping boxes from which it didn't spread yet in unfinished."""
+        adjacent_mines = self.adjacent_mines
+        return flood_reveal(idx, self.neighbor_index, self.covered.__getitem__,
+            lambda i: not adjacent_mines[i], limit, self.unfinished)
+
+    def _set_uncovered(self, uncovered_idxs):
+        """Uncover boxes with given indexes. Wrongly marked ones lose their
+        marks."""
+        for uncovered_idx in uncovered_idxs:
+            chunk, offset = self._locate(uncovered_idx)
+            chunk.covered[offset] = 0
+            chunk.touched = True
+            if chunk.marked[offset]:
+                # Box was wrongly marked, so it loses its mark.
+                chunk.marked[offset] = 0
+                self.marked_idxs.discard(uncovered_idx)
+                self.marks -= 1
+        self.uncovered_boxes += len(uncovered_idxs)
+
+    def mark(self, idx):
+        """Mark covered box idx as box with mine. Returns True if box was
+        marked."""
+        chunk, offset = self._locate(idx)
+        if not chunk.covered[offset] or chunk.marked[offset] or self.lost:
+            return False
+        chunk.marked[offset] = 1
+        chunk.touched = True
+        self.marked_idxs.add(idx)
+        self.marks += 1
+        return True
+
+    def unmark(self, idx):
+        """Remove mark from box idx. Returns True if mark was removed."""
+        chunk, offset = self._locate(idx)
+        if not chunk.marked[offset] or self.lost:
+            return False
+        chunk.marked[offset] = 0
+        self.marked_idxs.discard(idx)
+        self.marks -= 1
+        return True
+
+    def mines_left(self):
+        """Return number of marks, as the number of mines isn't known."""
+        return self.marks
+
+    def all_mines_marked(self):
+        """Mines never run out, so they can't be all marked."""
+        return False
+
+    def all_safe_uncovered(self):
+        """Boxes without mines never run out either."""
+        return False
+
+    def is_won(self):
+        """Endless game can't be won."""
+        return False
+
+    def is_over(self):
+        """Return True if the game was lost."""
+        return self.lost
+
+    def uncovered_indexes(self):
+        """Return list of indexes of uncovered boxes."""
+        chunks = [(key, chunk.covered) for key, chunk in self.chunks.items()
+            if chunk.touched]
+        chunks.extend((key, unpack_bits(saved[0], CHUNK_BOXES))
+            for key, saved in self.saved_chunks.items())
+        uncovered = []
+        for (chunk_column, chunk_row), covered in chunks:
+            for offset in range(CHUNK_BOXES):
+                if not covered[offset]:
+                    row, column = divmod(offset, CHUNK_SIZE)
+                    uncovered.append((chunk_row * CHUNK_SIZE + row) * self.columns
+                        + chunk_column * CHUNK_SIZE + column)
+        return uncovered
+
+    def marked_indexes(self):
+        """Return list of indexes of marked boxes."""
+        return list(self.marked_idxs)
+
+    def wrongly_marked(self):
+        """Return list of indexes of marked boxes without mine."""
+        return [idx for idx in self.marked_idxs if not self.has_mine[idx]]
+
+    def unmarked_mines(self):
+        """Mines of the whole board can't be listed; returns empty list."""
+        return []
@@ -0,0 +1,35 @@
+import pygame
+
+class DirtyRects:
+    """Class collecting parts of the screen that were drawn into since the
+    last display update, so only those parts need to be updated."""
+    def __init__(self, max_rects=64):
+        """Initialize empty collection. If more than max_rects rects are
+        collected, they are updated as one rect containing all of them."""
+        self.max_rects = max_rects
+        self.rects = []
+        self.whole_screen = False
+        
+    def add(self, rect):
+        """Record that given rect was drawn into."""
+        if not self.whole_screen:
+            self.rects.append(pygame.Rect(rect))
+    
+    def add_all(self):
+        """Record that whole screen was drawn into."""
+        self.whole_screen = True
+        self.rects.clear()
+    
+    def pop_rects(self, screen_rect):
+        """Return list of rects which need to be updated and forget them.
+        Empty list means that nothing has changed."""
+        if self.whole_screen:
+            rects = [screen_rect]
+        elif len(self.rects) > self.max_rects:
+            rects = [self.rects[0].unionall(self.rects[1:])]
+        else:
+            rects = self.rects
+        
+        self.rects = []
+        self.whole_screen = False
+        return rects
@@ -1,5 +1,8 @@
 import pygame
 
+from profiler import profiler
+
+@profiler.timed('draw_lines_around_rect')
 def draw_lines_around_rect(mines_game, rect, surf, thickness=6, inside=False, 
 invert=False, singlecolored=False):
     """Draw white and grey lines around given rect into given surface. As
@@ -0,0 +1,194 @@
+from array import array
+from random import randrange
+
+from mine_counts import count_adjacent_mines
+from mine_placement import get_safe_zone, place_mines
+from neighbor_index import get_neighbor_index
+from reveal import flood_reveal
+
+class Board:
+    """Class holding state and rules of one game of minesweeper. It doesn't
+    draw anything and doesn't need pygame, so games can be played without
+    display. Boxes are referenced by flat index (row * columns + column) and
+    their state is kept in bytearrays indexed the same way."""
+    endless = False
+    unfinished = ()         # uncovering always finishes at once
+
+    def __init__(self, columns, rows, mines, safe_zone='neighbors', seed=None,
+        use_numpy=True):
+        """Initialize board with all boxes covered. Mines are placed on the
+        first uncovered box, or by calling place_mines."""
+        self.columns = columns
+        self.rows = rows
+        self.mines = mines
+        self.safe_zone = safe_zone
+        self.seed = seed
+        self.use_numpy = use_numpy
+        self.neighbor_index = get_neighbor_index(columns, rows)
+        self.size = self.neighbor_index.size
+
+        # State of boxes.
+        self.has_mine = bytearray(self.size)
+        self.adjacent_mines = bytearray(self.size)
+        self.covered = bytearray(b'\x01') * self.size
+        self.marked = bytearray(self.size)
+        self.mine_idxs = array('i')
+        self.first_idx = None           # box mines were placed around
+
+        # Game state and counters for checking winning conditions.
+        self.mines_placed = False
+        self.lost = False
+        self.exploded_idx = None        # box with mine which was uncovered
+        self.covered_safe_boxes = self.size - mines
+        self.marks = 0
+        self.correct_marks = 0          # number of marked boxes with mines
+
+    @classmethod
+    def from_settings(cls, settings, seed=None):
+        """Create board according to game settings. If neither seed nor
+        settings.seed is given, random seed is picked, so it's known before
+        mines are placed."""
+        if seed is None:
+            seed = settings.seed
+        if seed is None:
+            seed = randrange(2**32)
+        return cls(settings.columns, settings.rows, settings.mines,
+            settings.safe_zone, seed, settings.use_numpy)
+
+    def place_mines(self, first_idx=None, seed=None):
+        """Place mines to the board. No mine will be placed into box
+        first_idx and, depending on safe_zone, into its adjacent boxes. If
+        neither seed nor self.seed is given, random seed is picked. Used seed
+        is stored in self.seed, so the board can be created again."""
+        if seed is None:
+            seed = self.seed
+        if seed is None:
+            seed = randrange(2**32)
+
+        safe_idxs = []
+        if first_idx is not None:
+            safe_idxs = get_safe_zone(self.neighbor_index, first_idx,
+                self.safe_zone)
+            if self.mines > self.size - len(safe_idxs):
+                # Not enough room for mines; keep safe only the clicked box.
+                safe_idxs = [first_idx]
+
+        self.first_idx = first_idx
+        self.set_mines(place_mines(self.size, self.mines, safe_idxs, seed), seed)
+
+    def set_mines(self, mine_idxs, seed=None):
+        """Place mines into boxes with given indexes and count adjacent mines
+        of every box."""
+        self.seed = seed
+        self.mine_idxs = array('i', mine_idxs)
+        self.mines = len(self.mine_idxs)
+        self.has_mine = bytearray(self.size)
+        for idx in self.mine_idxs:
+            self.has_mine[idx] = 1
+        self.count_adjacent_mines()
+
+        # Boxes can't be uncovered before mines are placed, but they could
+        # have been marked.
+        self.covered_safe_boxes = self.size - self.mines
+        self.correct_marks = len([idx for idx in self.mine_idxs if self.marked[idx]])
+        self.mines_placed = True
+
+    def count_adjacent_mines(self):
+        """Count adjacent mines of every box."""
+        self.adjacent_mines = count_adjacent_mines(self.mine_idxs,
+            self.neighbor_index, self.use_numpy)
+
+    def uncover(self, idx):
+        """Uncover box idx. If it doesn't have adjacent mines, all connected
+        boxes without adjacent mines are uncovered as well. If mines were
+        placed around first_idx before the game started, other boxes can't
+        be uncovered until first_idx is. Returns list of indexes of uncovered
+        boxes (empty if nothing was uncovered)."""
+        if not self.mines_placed:
+            # Mines are placed only after the first click, so it can't be
+            # a mine.
+            self.place_mines(idx)
+
+        if not self.covered[idx] or self.is_over():
+            return []
+        if (self.first_idx is not None and idx != self.first_idx
+            and self.covered_safe_boxes == self.size - self.mines):
+            # Mines were placed around first_idx, so the game starts there.
+            return []
+
+        if self.has_mine[idx]:
+            self.covered[idx] = 0
+            self.lost = True
+            self.exploded_idx = idx
+            return [idx]
+
+        covered = self.covered
+        adjacent_mines = self.adjacent_mines
+        uncovered_idxs = flood_reveal(idx, self.neighbor_index,
+            covered.__getitem__, lambda i: not adjacent_mines[i])
+        for uncovered_idx in uncovered_idxs:
+            covered[uncovered_idx] = 0
+            if self.marked[uncovered_idx]:
+                # Box was wrongly marked, so it loses its mark.
+                self.marked[uncovered_idx] = 0
+                self.marks -= 1
+        self.covered_safe_boxes -= len(uncovered_idxs)
+        return uncovered_idxs
+
+    def mark(self, idx):
+        """Mark covered box idx as box with mine. Returns True if box was
+        marked."""
+        if not self.covered[idx] or self.marked[idx] or self.lost:
+            return False
+        self.marked[idx] = 1
+        self.marks += 1
+        if self.has_mine[idx]:
+            self.correct_marks += 1
+        return True
+
+    def unmark(self, idx):
+        """Remove mark from box idx. Returns True if mark was removed."""
+        if not self.marked[idx] or self.lost:
+            return False
+        self.marked[idx] = 0
+        self.marks -= 1
+        if self.has_mine[idx]:
+            self.correct_marks -= 1
+        return True
+
+    def mines_left(self):
+        """Return number of mines minus number of marks."""
+        return self.mines - self.marks
+
+    def all_mines_marked(self):
+        """Return True if every mine is marked and there's no other mark."""
+        return self.mines_left() == 0 and self.correct_marks == self.mines
+
+    def all_safe_uncovered(self):
+        """Return True if every box without mine is uncovered."""
+        return self.mines_placed and self.covered_safe_boxes == 0
+
+    def is_won(self):
+        """Return True if winning conditions were met."""
+        return not self.lost and (self.all_mines_marked() or self.all_safe_uncovered())
+
+    def is_over(self):
+        """Return True if the game was either lost or won."""
+        return self.lost or self.is_won()
+
+    def uncovered_indexes(self):
+        """Return list of indexes of uncovered boxes."""
+        return [idx for idx in range(self.size) if not self.covered[idx]]
+
+    def marked_indexes(self):
+        """Return list of indexes of marked boxes."""
+        return [idx for idx in range(self.size) if self.marked[idx]]
+
+    def wrongly_marked(self):
+        """Return list of indexes of marked boxes without mine."""
+        return [idx for idx in range(self.size)
+            if self.marked[idx] and not self.has_mine[idx]]
+
+    def unmarked_mines(self):
+        """Return list of indexes of boxes with mine that aren't marked."""
+        return [idx for idx in self.mine_idxs if not self.marked[idx]]
@@ -0,0 +1,34 @@
+class LatencyCounter:
+    """Class measuring input latency, which is time from arrival of an
+    event into the queue until its result is visible on the display. It
+    includes time the event waited in the queue for the main loop to poll
+    it, so event driven and polling loop can be compared."""
+    def __init__(self):
+        """Initialize counter with no measurements."""
+        self.reset()
+    
+    def reset(self):
+        """Forget all measurements."""
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+    
+    def record(self, latency):
+        """Add one measured latency (in seconds)."""
+        self.count += 1
+        self.total += latency
+        self.last = latency
+        if latency > self.max:
+            self.max = latency
+    
+    def mean(self):
+        """Return mean latency in seconds."""
+        if self.count == 0:
+            return 0.0
+        return self.total / self.count
+    
+    def summary(self):
+        """Return string describing measured latencies."""
+        return (f'{self.count} events, mean latency {self.mean()*1000:.2f} ms, '
+            f'max {self.max*1000:.2f} ms')
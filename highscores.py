@@ -0,0 +1,124 @@
+import sqlite3
+
+from settings import Settings
+
+# Difficulties with fixed boards; old highscore table kept only those (and
+# 'custom', whose board wasn't stored, so its time can't be kept). Boards
+# which can be cleared without guessing (no_guess) are scored separately.
+STANDARD_DIFFICULTIES = ('beginner', 'intermediate', 'expert')
+
+# Statements are constant strings with parameters, so sqlite3 prepares each
+# of them once and reuses it from its statement cache.
+CREATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS best_time(
+    difficulty TEXT NOT NULL,
+    columns INTEGER NOT NULL,
+    rows INTEGER NOT NULL,
+    mines INTEGER NOT NULL,
+    no_guess INTEGER NOT NULL,
+    time INTEGER NOT NULL,
+    PRIMARY KEY (difficulty, columns, rows, mines, no_guess)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS win(
+    difficulty TEXT NOT NULL,
+    columns INTEGER NOT NULL,
+    rows INTEGER NOT NULL,
+    mines INTEGER NOT NULL,
+    no_guess INTEGER NOT NULL,
+    time INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS win_by_board
+    ON win(difficulty, columns, rows, mines, no_guess, time);
+"""
+UPSERT_BEST = """
+INSERT INTO best_time(difficulty, columns, rows, mines, no_guess, time)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT(difficulty, columns, rows, mines, no_guess)
+DO UPDATE SET time = excluded.time WHERE excluded.time < best_time.time
+"""
+INSERT_WIN = """
+INSERT INTO win(difficulty, columns, rows, mines, no_guess, time)
+VALUES (?, ?, ?, ?, ?, ?)
+"""
+SELECT_BEST = """
+SELECT time FROM best_time
+WHERE difficulty = ? AND columns = ? AND rows = ? AND mines = ? AND no_guess = ?
+"""
+SELECT_TOP = """
+SELECT time FROM win
+WHERE difficulty = ? AND columns = ? AND rows = ? AND mines = ? AND no_guess = ?
+ORDER BY time LIMIT ?
+"""
+
+class HighscoreRepository:
+    """Class keeping times of won games in SQLite database. Every board
+    (difficulty, columns, rows, mines and whether it's a no guess board) has
+    its own best time and leaderboard, so custom boards don't share one
+    score and no guess boards aren't compared with harder ones."""
+    def __init__(self, path='highscore.sqlite3'):
+        """Open database (creating it if needed) and move scores from the old
+        highscore table."""
+        self.con = sqlite3.connect(path)
+        # Writer doesn't block readers and commits don't wait for whole
+        # database to be synced.
+        self.con.execute('PRAGMA journal_mode=WAL')
+        self.con.execute('PRAGMA synchronous=NORMAL')
+        with self.con:
+            self.con.executescript(CREATE_SCHEMA)
+            self._migrate_old_table()
+
+    def _migrate_old_table(self):
+        """Move times of standard difficulties from old highscore(difficulty,
+        time) table and drop it."""
+        old_table = self.con.execute("SELECT 1 FROM sqlite_master "
+            "WHERE type = 'table' AND name = 'highscore'").fetchone()
+        if old_table is None:
+            return
+        for difficulty, time in self.con.execute(
+            'SELECT difficulty, time FROM highscore').fetchall():
+            if difficulty in STANDARD_DIFFICULTIES and time is not None:
+                config = board_config(Settings(diff=difficulty))
+                self.con.execute(UPSERT_BEST, config + (time,))
+                self.con.execute(INSERT_WIN, config + (time,))
+        self.con.execute('DROP TABLE highscore')
+
+    def record(self, config, time):
+        """Save time of won game on board config (tuple from board_config).
+        Best time of the board is replaced only if time is better. Returns
+        True if time is new best time."""
+        best = self.best(config)
+        with self.con:
+            self.con.execute(INSERT_WIN, config + (time,))
+            self.con.execute(UPSERT_BEST, config + (time,))
+        return best is None or time < best
+
+    def best(self, config):
+        """Return best time of board config or None if it wasn't won yet."""
+        row = self.con.execute(SELECT_BEST, config).fetchone()
+        return row[0] if row is not None else None
+
+    def top(self, config, count=10):
+        """Return list of count best times of board config, best first."""
+        return [row[0] for row in self.con.execute(SELECT_TOP, config + (count,))]
+
+    def best_times(self, no_guess=False):
+        """Return dictionary (difficulty: best time) of standard difficulties
+        which were won (on no guess boards if no_guess is True)."""
+        best_times = {}
+        for difficulty in STANDARD_DIFFICULTIES:
+            settings = Settings(diff=difficulty)
+            settings.no_guess = no_guess
+            time = self.best(board_config(settings))
+            if time is not None:
+                best_times[difficulty] = time
+        return best_times
+
+    def close(self):
+        """Close database."""
+        self.con.close()
+
+def board_config(settings):
+    """Return tuple (difficulty, columns, rows, mines, no_guess) identifying
+    board of given settings."""
+    return (settings.difficulty, settings.columns, settings.rows, settings.mines,
+        int(bool(settings.no_guess)))
@@ -0,0 +1,37 @@
+try:
+    import numpy as np
+except ImportError:
+    # NumPy is optional, counting will be done in pure Python.
+    np = None
+
+# For smaller boards NumPy's overhead is bigger than the time it saves.
+NUMPY_MIN_SIZE = 400
+
+def count_adjacent_mines(mine_idxs, neighbor_index, use_numpy=True):
+    """Return bytearray where item on each flat index is number of mines in
+    boxes adjacent to that box. If NumPy is installed and use_numpy is True,
+    whole board is counted at once."""
+    if np is not None and use_numpy and neighbor_index.size >= NUMPY_MIN_SIZE:
+        return _count_with_numpy(mine_idxs, neighbor_index.columns,
+            neighbor_index.rows)
+
+    counts = bytearray(neighbor_index.size)
+    for idx in mine_idxs:
+        for adj_idx in neighbor_index.adjacent(idx):
+            counts[adj_idx] += 1
+    return counts
+
+def _count_with_numpy(mine_idxs, columns, rows):
+    """Count adjacent mines as sum of 3x3 neighborhood over mine bitmap."""
+    # Mine bitmap padded by one empty box on each side.
+    bitmap = np.zeros((rows + 2, columns + 2), dtype=np.uint8)
+    mine_idxs = np.asarray(mine_idxs, dtype=np.intp)
+    bitmap[mine_idxs // columns + 1, mine_idxs % columns + 1] = 1
+
+    counts = np.zeros((rows, columns), dtype=np.uint8)
+    for d_row in range(3):
+        for d_column in range(3):
+            if d_row == 1 and d_column == 1:
+                continue
+            counts += bitmap[d_row:d_row+rows, d_column:d_column+columns]
+    return bytearray(counts.tobytes())
@@ -0,0 +1,38 @@
+from random import Random
+
+def place_mines(size, mines, safe_idxs=(), seed=None):
+    """Return list of flat indexes of boxes where mines should be placed.
+    Indexes are picked uniformly without replacement from range(size) except
+    safe_idxs, so it takes time proportional to number of mines no matter how
+    dense the field is. The same seed always gives the same mines."""
+    safe_idxs = sorted(set(safe_idxs))
+    free_boxes = size - len(safe_idxs)
+    if mines > free_boxes:
+        raise ValueError(f"Can't place {mines} mines into {free_boxes} boxes.")
+
+    rng = Random(seed)
+    mine_idxs = []
+    # Pick among boxes that aren't safe and then shift each pick over safe
+    # boxes, so n-th pick becomes n-th box that isn't safe.
+    for idx in rng.sample(range(free_boxes), mines):
+        for safe_idx in safe_idxs:
+            if safe_idx <= idx:
+                idx += 1
+            else:
+                break
+        mine_idxs.append(idx)
+
+    return mine_idxs
+
+def get_safe_zone(neighbor_index, idx, safe_zone='neighbors'):
+    """Return list of indexes which can't contain mine when box idx is
+    clicked first. safe_zone is either 'cell' or 'neighbors'."""
+    if safe_zone == 'neighbors':
+        return [idx] + list(neighbor_index.adjacent(idx))
+    return [idx]
+
+def max_mines(columns, rows):
+    """Return the most mines which can be placed into board of given size.
+    First clicked box always stays without mine; if its adjacent boxes
+    don't fit, engine.Board keeps only the clicked box safe."""
+    return columns * rows - 1
@@ -1,11 +1,45 @@
-import sqlite3
+import argparse
+from time import perf_counter
 
 import pygame
 
 from base_window import BaseWindow
+from bitboard import BitBoard
 from body_grid import Grid
+from chunked_board import ChunkedBoard
+from dirty_rects import DirtyRects
 from draw_lines_around_rect import draw_lines_around_rect as rect_lines
+from engine import Board
+from event_latency import LatencyCounter
+from highscores import board_config, HighscoreRepository
+from mine_placement import max_mines
+from no_guess import NoGuessPool
+from probability import mine_probabilities
+from profiler import profiler
+from replay import MARK, NEW_GAME, RESTART, UNCOVER, read_replay, ReplayRecorder
 from settings import Settings
+from solver import Solver
+
+# Waiting for event shorter than this (in seconds) means that the event was
+# already queued.
+IMMEDIATE_WAKE = 0.001
+
+# Keys panning the board (key: (columns, rows)).
+PAN_KEYS = {
+    pygame.K_LEFT: (-1, 0),
+    pygame.K_RIGHT: (1, 0),
+    pygame.K_UP: (0, -1),
+    pygame.K_DOWN: (0, 1),
+}
+
+# Events telling that the window was uncovered or restored, so its content
+# may have been lost and whole screen must be updated again.
+EXPOSE_EVENTS = (
+    pygame.WINDOWEXPOSED,
+    pygame.VIDEOEXPOSE,
+    pygame.WINDOWRESTORED,
+    pygame.ACTIVEEVENT,
+)
 
 class Minesweeper:
     """The main class managing game assets and behavior."""
@@ -17,16 +51,26 @@ class Minesweeper:
             self.settings = Settings()
             self.custom_settings = {'columns': None, 'rows': None, 'mines': None}
             
-            # Create database for keeping high scores and create variable highscore
-            self.con = sqlite3.connect('highscore.sqlite3')
-            cur = self.con.cursor()
-            # create highscore table in database; error means it already exists
-            try:
-                cur.execute("CREATE TABLE highscore(difficulty, time)")
-            except sqlite3.OperationalError:
-                pass
-            self.highscore = self.get_high_score()  # dictionary (difficulty: time)
-            cur.close()
+            # Parts of screen which need to be updated on display.
+            self.dirty_rects = DirtyRects()
+            # Time from handling of event until its result is on display.
+            self.event_latency = LatencyCounter()
+            if self.settings.profile:
+                profiler.enabled = True
+            # ReplayRecorder when player's inputs should be recorded.
+            self.recorder = None
+            # Generator of boards which can be cleared without guessing.
+            self.no_guess_pool = NoGuessPool(self.settings.no_guess_queue_size,
+                self.settings.no_guess_processes)
+            
+            # Database of won games and best times of standard difficulties
+            # shown in highscores menu.
+            self.highscores = HighscoreRepository()
+            self.highscore = self.highscores.best_times(self.settings.no_guess)  # dictionary (difficulty: time)
+        
+        # Boards are generated in advance, so the first no guess game doesn't
+        # wait for workers to start.
+        self.fill_no_guess_pool()
         
         self.window = BaseWindow(self)
         self.screen = self.window.screen
@@ -78,60 +122,72 @@ class Minesweeper:
         
     def _uncover_clicked_box(self, mouse_pos):
         """Uncover the box that has been clicked."""
-        for row in self.field_of_boxes:
-            for box in row:
-                if box.collidepoint(mouse_pos):
-                    clicked_box = box
-        
-        if clicked_box.covered:
-            clicked_box.covered = False
-            uncovering_boxes = [clicked_box]
-            
-            if clicked_box.has_mine:
-                self.show_wrongly_marked_boxes()
-                self.active = False
-                pygame.time.set_timer(self.timer_event, 0)
-                self.timer_active = False
-                self.window.gui.restart_button.draw_button('dead_smile')
-                self.dead_smile = True
-            
-            # clicked box doesn't have adjacent mines; uncover all connected
-            # boxes without adjacent mines
-            elif not clicked_box.adjacent_mines:
-                
-                while True:
-                    copy_uncovering_boxes = list(uncovering_boxes)
-                    for box in copy_uncovering_boxes:
-                        if not box.adjacent_mines and not box.adj_boxes_checked:
-                            for adj_box in box.adjacent_boxes:
-                                if adj_box not in uncovering_boxes and adj_box.covered:
-                                    uncovering_boxes.append(adj_box)
-                                    adj_box.covered = False
-                            
-                            box.adj_boxes_checked = True
-                    
-                    if uncovering_boxes == copy_uncovering_boxes:
-                        break
-            
-            uncovering_marked_boxes = []
-            for box in uncovering_boxes:
-                box.remove_overlay(clicked_box)
-                if box.marked:
-                    uncovering_marked_boxes.append(box)
-            if len(uncovering_marked_boxes) > 0:
-                self.mines_left += len(uncovering_marked_boxes)
-                self.window.gui.show_mines_left(self.mines_left)
-                
+        clicked_idx = self.body_grid.get_box_index(mouse_pos)
+        if clicked_idx is None:
+            return
+        
+        # Board uncovers the box and, if it doesn't have adjacent mines, all
+        # connected boxes without adjacent mines.
+        reveal_start = perf_counter()
+        uncovered_idxs = self.board.uncover(clicked_idx)
+        if profiler.enabled:
+            profiler.record('reveal', perf_counter() - reveal_start)
+        if not uncovered_idxs:
+            return
+        
+        self.solver.update(uncovered_idxs)
+        clicked_box = self.body_grid.get_box(clicked_idx)
+        if self.board.lost:
+            self.show_wrongly_marked_boxes()
+            self.active = False
+            pygame.time.set_timer(self.timer_event, 0)
+            self.timer_active = False
+            self.window.gui.restart_button.draw_button('dead_smile')
+            self.dead_smile = True
+        
+        self._draw_uncovered_boxes(uncovered_idxs, clicked_box)
+    
+    def _continue_reveal(self):
+        """Uncover next part of boxes which one click couldn't uncover at
+        once (on endless board). Called every frame until it's done."""
+        reveal_start = perf_counter()
+        uncovered_idxs = self.board.continue_reveal()
+        if profiler.enabled:
+            profiler.record('reveal', perf_counter() - reveal_start)
+        if uncovered_idxs:
+            self.solver.update(uncovered_idxs)
+            self._draw_uncovered_boxes(uncovered_idxs)
+    
+    def _draw_uncovered_boxes(self, uncovered_idxs, clicked_box=None):
+        """Draw boxes which were just uncovered."""
+        draw_start = perf_counter()
+        if len(uncovered_idxs) > self.body_grid.view_columns * self.body_grid.view_rows:
+            # Most of uncovered boxes aren't visible; draw only visible ones.
+            self.body_grid.draw_boxes()
+        else:
+            for idx in uncovered_idxs:
+                box = self.body_grid.get_box(idx)
+                if box is not None:
+                    box.remove_overlay(clicked_box)
+        if profiler.enabled:
+            profiler.record('draw', perf_counter() - draw_start)
+        
+        # Uncovered boxes lose their marks.
+        self._update_mines_left()
+    
+    def _update_mines_left(self):
+        """Show number of mines left if it has changed."""
+        if self.mines_left != self.board.mines_left():
+            self.mines_left = self.board.mines_left()
+            self.window.gui.show_mines_left(self.mines_left)
     
     def show_wrongly_marked_boxes(self):
-        """If clicked on box with mine, highlight boxes wrongly marked as boxes
-        with mines."""
-        wrongly_marked_boxes = []
-        pink = (255, 150, 150)
-        for row in self.field_of_boxes:
-            for box in row:
-                if box.marked and not box.has_mine:
-                    wrongly_marked_boxes.append(box)
+        """If clicked on box with mine, highlight visible boxes wrongly marked
+        as boxes with mines."""
+        wrongly_marked_boxes = [self.body_grid.get_box(idx)
+            for idx in self.board.wrongly_marked()]
+        wrongly_marked_boxes = [box for box in wrongly_marked_boxes if box is not None]
+        pink = self.settings.wrong_mark_color
         
         if len(wrongly_marked_boxes) > 0:
             self.overlays.empty()
@@ -143,76 +199,108 @@ class Minesweeper:
             self.overlays.empty()
             
             for box in wrongly_marked_boxes:
-                box.marked = False
-                self.mark_mine(box=box, count=False)
+                self._draw_marked_mine_sign(box)
             
-    def mark_mine(self, mouse_pos=None, box=None, count=True):
+    def mark_mine(self, mouse_pos=None, box=None):
         """Mark with marked_mine sign box that has been clicked.
         Either need to provide with mouse_pos or box."""
         if mouse_pos:
-            for row in self.field_of_boxes:
-                for box in row:
-                    if box.collidepoint(mouse_pos):
-                        clicked_box = box
+            clicked_box = self.body_grid.get_clicked_box(mouse_pos)
+            if clicked_box is None:
+                return
         
         else:
             clicked_box = box
         
         if not clicked_box.marked:
-            clicked_box.marked = True
-            sign = clicked_box.marked_mine_sign()
-            self.marked_boxes.add(sign)
-            self.marked_boxes.draw(self.screen)
-            self.marked_boxes.empty()
-            
-            if count == True:
-                self.mines_left -= 1
-                self.window.gui.show_mines_left(self.mines_left)
+            if self.board.mark(clicked_box.index):
+                self._draw_marked_mine_sign(clicked_box)
         else:
-            clicked_box.marked = False
+            self.board.unmark(clicked_box.index)
             clicked_box_overlay = clicked_box.create_overlay()
             self.overlays.add(clicked_box_overlay)
             self.overlays.draw(self.screen)
             self.overlays.empty()
+            self.dirty_rects.add(clicked_box)
+        
+        self._update_mines_left()
+    
+    def show_hint(self):
+        """Highlight one covered box which certainly doesn't have mine. If
+        there isn't any such box, box least likely to have mine is
+        highlighted in different color. Returns the box or None if there
+        isn't any covered box left."""
+        safe, mines = self.solver.solve()
+        color = self.settings.hint_color
+        hint_idx = None
+        first_idx = self.board.first_idx
+        if first_idx is not None and self.board.covered[first_idx]:
+            # Game has to start at first_idx.
+            hint_idx = first_idx
+        for idx in safe:
+            if hint_idx is None and not self.board.marked[idx]:
+                hint_idx = idx
+        
+        if hint_idx is None and not self.board.endless:
+            # Nothing is certain; pick the best guess.
+            color = self.settings.guess_hint_color
+            probabilities = mine_probabilities(self.board, mines, safe,
+                time_budget=self.settings.hint_time_budget)[0]
+            candidates = [idx for idx in probabilities
+                if not self.board.marked[idx] and idx not in mines]
+            if candidates:
+                hint_idx = min(candidates, key=probabilities.get)
+        
+        if hint_idx is None:
+            return None
+        return self._highlight_box(hint_idx, color)
+    
+    def _highlight_box(self, idx, color):
+        """Draw overlay of given color on covered box idx, panning the view
+        to it if needed. Returns the box."""
+        self.body_grid.scroll_to(idx)
+        box = self.body_grid.get_box(idx)
+        overlay = box.create_overlay(color=color)
+        self.overlays.add(overlay)
+        self.overlays.draw(self.screen)
+        self.overlays.empty()
+        self.dirty_rects.add(box)
+        return box
+    
+    def _draw_marked_mine_sign(self, box):
+        """Draw marked_mine sign into given box."""
+        sign = box.marked_mine_sign()
+        self.marked_boxes.add(sign)
+        self.marked_boxes.draw(self.screen)
+        self.marked_boxes.empty()
+        self.dirty_rects.add(box)
             
-            self.mines_left += 1
-            self.window.gui.show_mines_left(self.mines_left)
-            
+    @profiler.timed('check_winning')
     def check_winning(self):
         """Check if winning conditions were met. That means either all mines
         were marked correctly or all uncovered boxes that are left are only
-        boxes with mines. Returns True if conditions were met."""
+        boxes with mines. Returns True if conditions were met. Board only
+        checks its counters, so no box needs to be looked at."""
         win = False
-        if self.mines_left == 0:
-            correct_marked_boxes = []
-            for row in self.field_of_boxes:
-                for box in row:
-                    if box.marked and box in self.boxes_with_mines:
-                        correct_marked_boxes.append(box)
-                        
-            if len(correct_marked_boxes) == len(self.boxes_with_mines):
-                self.body_grid.uncover_left_boxes(self.field_of_boxes)
-                self.active = False
-                pygame.time.set_timer(self.timer_event, 0)
-                self.timer_active = False
-                win = True
+        if self.board.all_mines_marked():
+            self.body_grid.uncover_left_boxes(self.field_of_boxes)
+            self.active = False
+            pygame.time.set_timer(self.timer_event, 0)
+            self.timer_active = False
+            win = True
                 
-        else:
-            uncovered_boxes = []
-            for row in self.field_of_boxes:
-                for box in row:
-                    if box.covered and not box.marked:
-                        uncovered_boxes.append(box)
-            if len(uncovered_boxes) == self.mines_left:
-                for box in uncovered_boxes:
-                    if not box.has_mine:
-                        return False
-                    else:
-                        self.mark_mine(box=box)
-                self.active = False
-                pygame.time.set_timer(self.timer_event, 0)
-                self.timer_active = False
-                win = True
+        elif self.board.all_safe_uncovered():
+            for idx in self.board.unmarked_mines():
+                box = self.body_grid.get_box(idx)
+                if box is not None:
+                    self.mark_mine(box=box)
+                else:
+                    self.board.mark(idx)
+            self._update_mines_left()
+            self.active = False
+            pygame.time.set_timer(self.timer_event, 0)
+            self.timer_active = False
+            win = True
                 
         if win:
             self.window.gui.restart_button.draw_button('win_smile')
@@ -221,47 +309,13 @@ class Minesweeper:
         else:
             return False
     
-    def get_high_score(self, diff='all'):
-        """Get scores from database (either for currently chosen difficulty or
-        for all three difficulties). Diff argument takes 'all' or 
-        'beginner', or 'intermediate' or 'expert'.
-        Returns dictionary where keys are difficulty levels and values are times"""
-        cur = self.con.cursor()
-        if diff == 'all':
-            querry = "SELECT * FROM highscore"
-        else:
-            querry = f"SELECT difficulty, time FROM highscore WHERE difficulty='{diff}'"
-        highscore = cur.execute(querry).fetchall()
-        cur.close()
-        highscore_dict = dict()
-        for score in highscore:
-            highscore_dict.update({score[0]: score[1]})
-        return highscore_dict
-    
     def update_highscore(self):
-        """Updates highscore in proper row in database (based on selected
-        difficulty) and in self.highscore dict."""
-        row = self.settings.difficulty
-        
-        if row in self.highscore:
-            querry = f"UPDATE highscore SET time={self.time_left} WHERE difficulty='{row}'"
-        else:
-            querry = f"INSERT INTO highscore VALUES ('{row}', {self.time_left})"
-        
-        # update database
-        cur = self.con.cursor()
-        cur.execute(querry)
-        self.con.commit()
-        # update self.highscore dict
-        self.highscore.update({row: self.time_left})
-        
-    def compare_time_to_highscore(self):
-        """Compares currently achieved time to high score. Returns True if 
-        current time is better than time in high score."""
-        if self.highscore[self.settings.difficulty] > self.time_left:
-            return True
-        else:
-            return False
+        """Saves time of won game into database. Every board (difficulty and
+        its columns, rows and mines, no guess boards separately) has its own
+        best time, so custom boards are scored too. Updates self.highscore
+        dict if time is new best time."""
+        if self.highscores.record(board_config(self.settings), self.time_left):
+            self.highscore = self.highscores.best_times(self.settings.no_guess)
     
     def add_time(self):
         """Count seconds that passed since the first click on body_rect."""
@@ -422,6 +476,7 @@ class Minesweeper:
             self.screen.blit(dd_text, dd_text_rect)
             
         rect_lines(self, dd_rect, self.screen, thickness=1, inside=True, singlecolored='black')
+        self.dirty_rects.add(dd_rect)
         
     def show_sb_dropdown_menu(self, rect_text_tuples):
         """Displays highscores menu on screen. It takes as argument tuples of 
@@ -439,7 +494,9 @@ class Minesweeper:
             sb_text_rect = sb_text.get_rect(left=elem[0].left+10, top=elem[0].top)
             self.screen.blit(sb_text, sb_text_rect)
         
-        # show times next to difficulty levels
+        # show times next to difficulty levels (of no guess boards if they
+        # are played now)
+        self.highscore = self.highscores.best_times(self.settings.no_guess)
         for score in self.highscore:
             if score == 'beginner':
                 score_rect = rect_text_tuples[0][0]
@@ -454,6 +511,7 @@ class Minesweeper:
             self.screen.blit(score_text, score_text_rect)
             
         rect_lines(self, sb_dd_rect, self.screen, thickness=1, inside=True, singlecolored='black')
+        self.dirty_rects.add(sb_dd_rect)
     
     def highlight_dropdown_buttons(self, mouse_pos):
         """Highlight buttons in dropdown window if hovering over them."""
@@ -499,10 +557,16 @@ class Minesweeper:
         
         if new_difficulty != None and (self.settings.difficulty != new_difficulty or self.settings.difficulty == 'custom'):
             # difficulty is going to be changed
+            no_guess = self.settings.no_guess
             self.settings = Settings(diff=new_difficulty)
+            self.settings.no_guess = no_guess
             if new_difficulty == 'custom':
                 self.settings.columns = self.custom_settings['columns']
                 self.settings.rows = self.custom_settings['rows']
+                # Columns or rows might have been made smaller after mines
+                # were written, so mines must still fit beside first click.
+                self.custom_settings['mines'] = min(self.custom_settings['mines'],
+                    max_mines(self.settings.columns, self.settings.rows))
                 self.settings.mines = self.custom_settings['mines']
             else:
                 self.custom_settings = {'columns': None, 'rows': None, 'mines': None}
@@ -527,7 +591,7 @@ class Minesweeper:
             rect = pygame.Rect(left, top, width, height)
             
             # Create rects to which player will write numbers for custom settings.
-            num_width = 35
+            num_width = 80
             num_height = rect.height - 6
             num_left = rect.right - (num_width + 5)
             num_top = rect.top + ((rect.height - num_height) / 2)
@@ -613,6 +677,7 @@ class Minesweeper:
             self.screen.blit(text, text_rect)
             
         rect_lines(self, custom_rect, self.screen, thickness=1, inside=True, singlecolored='black')
+        self.dirty_rects.add(custom_rect)
     
     def write_to_custom_diff_window(self, event, active=True):
         """Write into columns, rows and mines options in custom diff window.
@@ -649,12 +714,16 @@ class Minesweeper:
                     else:
                         try:
                             size = self.custom_settings['columns'] * self.custom_settings['rows']
+                            written_number = max(written_number, 1)
                             ratio = size / written_number
                             if ratio > self.settings.max_ratio:
                                 if size % self.settings.max_ratio == 0:
                                     written_number = size / self.settings.max_ratio
                                 else:
                                     written_number = int(size / self.settings.max_ratio) + 1
+                            written_number = min(int(written_number), max_mines(
+                                self.custom_settings['columns'],
+                                self.custom_settings['rows']))
                             self.custom_settings['mines'] = written_number
                             written_setting = 'mines'
                         except TypeError:
@@ -671,11 +740,13 @@ class Minesweeper:
             else:
                 try:
                     num = int(event.unicode)
-                    # mines rect can contain 3 characters, columns and rows only 2 characters
+                    # number can't have more digits than the biggest allowed one
                     if self.active_rect == self.custom_tuples[2][-1]:
-                        max_chars = 3
+                        max_chars = len(str(self.settings.max_columns * self.settings.max_rows))
+                    elif self.active_rect == self.custom_tuples[1][-1]:
+                        max_chars = len(str(self.settings.max_rows))
                     else:
-                        max_chars = 2
+                        max_chars = len(str(self.settings.max_columns))
                     if len(self.input_text)+1 <= max_chars:
                             self.input_text += event.unicode
                 except ValueError:
@@ -684,6 +755,7 @@ class Minesweeper:
         
         # highlight box for writing
         self.screen.fill(color, self.active_rect)
+        self.dirty_rects.add(self.active_rect)
         
         # If self.custom_settings contains some filled numbers, show them in
         # proper rects. If user clicks to writing rect, it will become white 
@@ -721,6 +793,7 @@ class Minesweeper:
         height = self.window.gui.head_rect.height + 30
         need_to_clear_rect = pygame.Rect(0, top, self.screen.get_rect().width, height)
         self.screen.fill(self.settings.bg_color, need_to_clear_rect)
+        self.dirty_rects.add(need_to_clear_rect)
         # Draw gui rects and lines.
         redraw_rects = list(self.gui_rects)
         redraw_rects.remove(self.gui_rects[0])
@@ -743,8 +816,9 @@ class Minesweeper:
         self.ok_highlighted = False
         self.active_rect = None
     
-    def prep_new_game(self):
-        """Resetup everything."""
+    def prep_new_game(self, board=None):
+        """Resetup everything. If board (engine.Board) isn't given, new one
+        is created according to settings."""
         groups = [self.mines, self.overlays, self.marked_boxes, 
             self.restart_button_group]
         for group in groups:
@@ -760,20 +834,31 @@ class Minesweeper:
         self.window.gui.draw_rects(self.gui_rects)
         self.window.gui.draw_lines()
         
-        # Create gaming grid
+        # Create board holding state of the game and gaming grid drawing it.
+        if board is None and self.settings.difficulty == 'endless':
+            board = ChunkedBoard.from_settings(self.settings)
+        if board is None and self.settings.no_guess:
+            board = self.no_guess_pool.get(self.settings.columns,
+                self.settings.rows, self.settings.mines, self.settings.safe_zone,
+                self.settings.no_guess_timeout)
+        if board is None:
+            board_class = BitBoard if self.settings.bitboard else Board
+            board = board_class.from_settings(self.settings)
+        self.board = board
+        self.solver = Solver(self.board)     # finds safe boxes for hints
+        if self._recording():
+            self.recorder.start_game(self.board)
+        self.body_grid.reset_view()
         self.field_of_boxes = self.body_grid.create_field_of_boxes()   # passed is body_rect without color
         
-        # Set up mines and correct adjacent_mines variable for each box.
-        self.boxes_with_mines = self.body_grid.set_up_mines(self.field_of_boxes)
-        self.body_grid.check_adj_boxes(self.field_of_boxes)
-        
         # Hide all boxes by displaying overlay on them.
-        self.overlays.add(self.body_grid.hide_all_boxes(self.field_of_boxes))
-        self.overlays.draw(self.screen)
-        self.overlays.empty()
+        self.body_grid.hide_all_boxes(self.field_of_boxes)
+        if self.board.first_idx is not None:
+            # Mines are already placed, so show where the game starts.
+            self._highlight_box(self.board.first_idx, self.settings.start_color)
         
         # Write mines left.
-        self.mines_left = self.settings.mines
+        self.mines_left = self.board.mines_left()
         self.window.gui.show_mines_left(self.mines_left)
         
         # Prepare timer.
@@ -784,120 +869,332 @@ class Minesweeper:
         # Prepare unclick event for restart_button.
         self.unclick_event = pygame.USEREVENT + 2
         
-    def run_game(self):
-        """Start the main loop for the game."""
-        self.prep_new_game()
+    def _handle_event(self, event):
+        """Handle single keyboard, mouse or timer event."""
+        if event.type == pygame.QUIT:
+            self.running = False
         
-        while self.running:
-            # Watch for keyboard and mouse events.
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.running = False
-                    
-                elif event.type == pygame.MOUSEBUTTONDOWN:
-                    mouse_pos = pygame.mouse.get_pos()
-                    button_clicked = pygame.mouse.get_pressed()
-                    if self.active:
-                        if self.window.gui.body_rect.collidepoint(mouse_pos):
-                            if not self.timer_active and (button_clicked[0] or button_clicked[2]):
-                            # first click to body_rect starts the timer
-                                self.timer_active = True
-                                pygame.time.set_timer(self.timer_event, 1000)
-                                
-                            if button_clicked[0]:   # left button
-                                self._uncover_clicked_box(mouse_pos)
-                            
-                            elif button_clicked[2]: # right button
-                                self.mark_mine(mouse_pos)
-                                
-                            self.check_winning()
-                            if self.check_winning():
-                            # game has been won
-                                
-                                if self.settings.difficulty in self.highscore.keys() and self.compare_time_to_highscore():
-                                # achieved time is better than time in
-                                # high score --> update highscore
-                                    self.update_highscore()
-                                
-                                elif not self.settings.difficulty in self.highscore.keys():
-                                # highscore in this diff setting hasn't been won
-                                # until now --> add new highscore
-                                    self.update_highscore()
-                    
-                    # restart button clicked
-                    if (self.window.gui.restart_button.rect.collidepoint(mouse_pos)
-                        and button_clicked[0] and not self.custom_menu_shown):
-                        self.window.gui.restart_button.click()
-                        pygame.time.set_timer(self.unclick_event, 250, loops=1)
+        # only parts of screen are updated, so uncovered window needs all
+        elif event.type in EXPOSE_EVENTS:
+            self.dirty_rects.add_all()
+            
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            mouse_pos = pygame.mouse.get_pos()
+            button_clicked = pygame.mouse.get_pressed()
+            if button_clicked[1] and self.window.gui.body_rect.collidepoint(mouse_pos):
+                # dragging with middle button pans the board
+                self.body_grid.start_drag(mouse_pos)
+            if self.active:
+                if self.window.gui.body_rect.collidepoint(mouse_pos):
+                    if not self.timer_active and (button_clicked[0] or button_clicked[2]):
+                    # first click to body_rect starts the timer
+                        self.timer_active = True
+                        pygame.time.set_timer(self.timer_event, 1000)
+                        
+                    if button_clicked[0]:   # left button
+                        self._record_input(UNCOVER, mouse_pos)
+                        self._uncover_clicked_box(mouse_pos)
                     
-                    # events for handling menu bar and changing difficulty
-                    diff_rect = self.window.gui.diff_rect
-                    scoreboard_rect = self.window.gui.scoreboard_rect
-                    if button_clicked[0] and diff_rect.collidepoint(mouse_pos) and not self.dropdown_menu_shown:
-                        self.show_dropdown_window(self.create_dropdown_window())
-                    elif button_clicked[0] and self.dropdown_menu_shown and not diff_rect.collidepoint(mouse_pos) and not self.custom_menu_shown:
-                        self.change_difficulty(mouse_pos)
+                    elif button_clicked[2]: # right button
+                        self._record_input(MARK, mouse_pos)
+                        self.mark_mine(mouse_pos)
                         
-                    elif button_clicked[0] and self.custom_menu_shown:
-                        for rect in self.custom_tuples:
-                            if rect[0].collidepoint(mouse_pos) and rect != self.custom_tuples[-1]:
-                                if not self.active_rect == rect[2]:
-                                    if self.active_rect != None:
-                                        self.write_to_custom_diff_window(event, active=False)
-                                    self.input_text = ''
-                                    self.active_rect = rect[2]
-                                    
-                            elif rect[0].collidepoint(mouse_pos) and rect == self.custom_tuples[-1]:
-                                dict_values = self.custom_settings.values()
-                                if None not in dict_values:
-                                    self.change_difficulty(mouse_pos)
-                                    
-                    elif button_clicked[0] and scoreboard_rect.collidepoint(mouse_pos) and not self.sb_dropdown_menu_shown:
-                        self.show_sb_dropdown_menu(self.create_sb_dropdown_window())
+                    if self.check_winning():
+                    # game has been won; database keeps the better time
+                        self.update_highscore()
+                    if not self.active and self._recording():
+                    # game is over; its inputs are written out, so a crash
+                    # or kill doesn't lose them
+                        self.recorder.flush()
+            
+            # restart button clicked
+            if (self.window.gui.restart_button.rect.collidepoint(mouse_pos)
+                and button_clicked[0] and not self.custom_menu_shown):
+                self.window.gui.restart_button.click()
+                pygame.time.set_timer(self.unclick_event, 250, loops=1)
+            
+            # events for handling menu bar and changing difficulty
+            diff_rect = self.window.gui.diff_rect
+            scoreboard_rect = self.window.gui.scoreboard_rect
+            if button_clicked[0] and diff_rect.collidepoint(mouse_pos) and not self.dropdown_menu_shown:
+                self.show_dropdown_window(self.create_dropdown_window())
+            elif button_clicked[0] and self.dropdown_menu_shown and not diff_rect.collidepoint(mouse_pos) and not self.custom_menu_shown:
+                self.change_difficulty(mouse_pos)
                 
-                # timer
-                elif event.type == self.timer_event:
-                    self.add_time()
-                # event handling that simple animation when clicking on
-                # restart button
-                elif event.type == self.unclick_event:
-                    pygame.time.set_timer(self.timer_event, 0)
-                    self.prep_new_game()
-            
-                # mainly events for highlighting rects in menu bar
-                elif event.type == pygame.MOUSEMOTION:
-                    mouse_pos = pygame.mouse.get_pos()
-                    self.highlight_menu_button(mouse_pos)
-                    if self.dropdown_menu_shown and self.diff_highlighted:
-                        self.highlight_dropdown_buttons(mouse_pos)
-                        
-                        if self.custom_menu_shown:
-                            if self.ok_tuple[0].collidepoint(mouse_pos) and not self.ok_button_highlighted:
-                                self.show_custom_diff_window(ok_highlighted=True,
-                                    just_ok=True)
-                                self.ok_button_highlighted = True
-                                
-                            elif not self.ok_tuple[0].collidepoint(mouse_pos) and self.ok_button_highlighted:
-                                self.show_custom_diff_window(just_ok=True)
-                                self.ok_button_highlighted = False
+            elif button_clicked[0] and self.custom_menu_shown:
+                for rect in self.custom_tuples:
+                    if rect[0].collidepoint(mouse_pos) and rect != self.custom_tuples[-1]:
+                        if not self.active_rect == rect[2]:
+                            if self.active_rect != None:
+                                self.write_to_custom_diff_window(event, active=False)
+                            self.input_text = ''
+                            self.active_rect = rect[2]
+                            
+                    elif rect[0].collidepoint(mouse_pos) and rect == self.custom_tuples[-1]:
+                        dict_values = self.custom_settings.values()
+                        if None not in dict_values:
+                            self.change_difficulty(mouse_pos)
+                            
+            elif button_clicked[0] and scoreboard_rect.collidepoint(mouse_pos) and not self.sb_dropdown_menu_shown:
+                self.show_sb_dropdown_menu(self.create_sb_dropdown_window())
+        
+        # timer
+        elif event.type == self.timer_event:
+            self.add_time()
+        # event handling that simple animation when clicking on
+        # restart button
+        elif event.type == self.unclick_event:
+            pygame.time.set_timer(self.timer_event, 0)
+            if self._recording():
+                self.recorder.record(RESTART)
+                self.recorder.flush()
+            self.prep_new_game()
+    
+        elif event.type == pygame.MOUSEBUTTONUP:
+            self.body_grid.stop_drag()
+        
+        # scrolling mouse wheel pans the board, with shift horizontally
+        elif event.type == pygame.MOUSEWHEEL:
+            if pygame.key.get_mods() & pygame.KMOD_SHIFT:
+                self.body_grid.pan(-event.y, 0)
+            else:
+                self.body_grid.pan(-event.x, -event.y)
+        
+        # mainly events for highlighting rects in menu bar
+        elif event.type == pygame.MOUSEMOTION:
+            mouse_pos = pygame.mouse.get_pos()
+            if self.body_grid.drag_start is not None:
+                self.body_grid.drag(mouse_pos)
+            self.highlight_menu_button(mouse_pos)
+            if self.dropdown_menu_shown and self.diff_highlighted:
+                self.highlight_dropdown_buttons(mouse_pos)
+                
+                if self.custom_menu_shown:
+                    if self.ok_tuple[0].collidepoint(mouse_pos) and not self.ok_button_highlighted:
+                        self.show_custom_diff_window(ok_highlighted=True,
+                            just_ok=True)
+                        self.ok_button_highlighted = True
                         
-                    elif self.dropdown_menu_shown and not self.diff_highlighted:
-                        self.hide_dropdown_window()
-                    
-                    elif self.sb_dropdown_menu_shown and not self.sb_highlighted:
-                        self.hide_dropdown_window()
+                    elif not self.ok_tuple[0].collidepoint(mouse_pos) and self.ok_button_highlighted:
+                        self.show_custom_diff_window(just_ok=True)
+                        self.ok_button_highlighted = False
                 
-                # event for checking for writing in custom difficulty settings
-                if self.active_rect != None and (event.type==pygame.KEYDOWN or event.type==pygame.MOUSEBUTTONDOWN):
-                    self.write_to_custom_diff_window(event)
+            elif self.dropdown_menu_shown and not self.diff_highlighted:
+                self.hide_dropdown_window()
             
-            # Make the most recently drawn screen visible.
-            pygame.display.flip()
+            elif self.sb_dropdown_menu_shown and not self.sb_highlighted:
+                self.hide_dropdown_window()
+        
+        # pressing H shows hint
+        elif (event.type == pygame.KEYDOWN and event.key == pygame.K_h
+            and self.active and self.active_rect == None):
+            self.show_hint()
+        
+        # arrow keys pan the board, with shift by more boxes at once
+        elif (event.type == pygame.KEYDOWN and event.key in PAN_KEYS
+            and self.active_rect == None):
+            d_columns, d_rows = PAN_KEYS[event.key]
+            if event.mod & pygame.KMOD_SHIFT:
+                d_columns *= self.settings.pan_step
+                d_rows *= self.settings.pan_step
+            self.body_grid.pan(d_columns, d_rows)
+        
+        # event for checking for writing in custom difficulty settings
+        if self.active_rect != None and (event.type==pygame.KEYDOWN or event.type==pygame.MOUSEBUTTONDOWN):
+            self.write_to_custom_diff_window(event)
+        
+    def fill_no_guess_pool(self):
+        """Start generating boards of current size if only boards which can
+        be cleared without guessing are played."""
+        if self.settings.no_guess and self.settings.difficulty != 'endless':
+            self.no_guess_pool.fill(self.settings.columns, self.settings.rows,
+                self.settings.mines, self.settings.safe_zone)
+    
+    def _recording(self):
+        """Return True if inputs are recorded. Endless boards don't fit into
+        replay log, so their games aren't recorded."""
+        return self.recorder is not None and not self.board.endless
+    
+    def _record_input(self, action, mouse_pos):
+        """Record clicking on box under mouse_pos into replay log."""
+        if self._recording():
+            idx = self.body_grid.get_box_index(mouse_pos)
+            if idx is not None:
+                self.recorder.record(action, idx)
+    
+    def play_replay(self, path, realtime=True):
+        """Play games recorded in replay log by clicking on the same boxes.
+        If realtime is False, games are played as fast as possible and only
+        the final state is displayed."""
+        game_start = perf_counter()
+        game_prepared = False
+        for action, time_ms, idx, board in read_replay(path):
+            if action == NEW_GAME:
+                self._prep_replayed_game(board)
+                game_start = perf_counter()
+                game_prepared = True
+                continue
+            elif action == RESTART:
+                continue
             
-            # Limit game's fps
-            self.clock.tick(20)
+            if realtime:
+                delay = game_start + time_ms / 1000 - perf_counter()
+                if delay > 0:
+                    pygame.time.wait(int(delay * 1000))
+                pygame.event.pump()
             
+            if self.active:
+                self.body_grid.scroll_to(idx)
+                mouse_pos = self.body_grid.get_box(idx).center
+                if action == UNCOVER:
+                    self._uncover_clicked_box(mouse_pos)
+                elif action == MARK:
+                    self.mark_mine(mouse_pos)
+                self.check_winning()
+            
+            if realtime:
+                self.time_left = time_ms // 1000
+                self.window.gui.show_time(self.time_left)
+                pygame.display.update(self.dirty_rects.pop_rects(self.screen.get_rect()))
+        
+        if not game_prepared:
+            # There was no game in replay log.
+            self.prep_new_game()
+        self.dirty_rects.add_all()
+    
+    def _prep_replayed_game(self, board):
+        """Prepare new game on board described by dictionary from replay log."""
+        size = (board['columns'], board['rows'], board['mines'])
+        difficulty = 'custom'
+        for diff in ('beginner', 'intermediate', 'expert'):
+            settings = Settings(diff=diff)
+            if (settings.columns, settings.rows, settings.mines) == size:
+                difficulty = diff
+        
+        current_size = (self.settings.columns, self.settings.rows, self.settings.mines)
+        if difficulty != self.settings.difficulty or size != current_size:
+            no_guess = self.settings.no_guess
+            self.settings = Settings(diff=difficulty)
+            self.settings.no_guess = no_guess
+            self.settings.columns, self.settings.rows, self.settings.mines = size
+            if difficulty == 'custom':
+                self.custom_settings = {'columns': size[0], 'rows': size[1],
+                    'mines': size[2]}
+            self.__init__(first_init=False)
+        
+        replayed_board = Board(board['columns'], board['rows'], board['mines'],
+            board['safe_zone'], board['seed'], self.settings.use_numpy)
+        if board['first_idx'] is not None:
+            # Mines were placed before the game started (no guess mode).
+            replayed_board.place_mines(board['first_idx'])
+        self.prep_new_game(replayed_board)
+        
+    def run_game(self, new_game=True):
+        """Start the main loop for the game. If new_game is False, the game
+        which is already prepared continues."""
+        if new_game:
+            self.prep_new_game()
+        
+        last_poll = perf_counter()
+        while self.running:
+            # Watch for keyboard and mouse events. Events don't tell when they
+            # came, so their arrival is estimated for measuring input latency.
+            if self.settings.event_driven and not self.board.unfinished:
+                # Sleep until an event comes. Timer and unclick events are
+                # posted by pygame timers, so they wake the loop up as well.
+                sleep_start = perf_counter()
+                events = [pygame.event.wait(self.settings.max_idle_wait)]
+                frame_start = perf_counter()
+                # The loop woke up when the event came. If it didn't sleep,
+                # the event was queued while the previous frame was handled.
+                if frame_start - sleep_start > IMMEDIATE_WAKE:
+                    arrival = frame_start
+                else:
+                    arrival = (last_poll + sleep_start) / 2
+                events.extend(pygame.event.get())
+            else:
+                events = pygame.event.get()
+                frame_start = perf_counter()
+                # Events came anytime since the previous poll; on average in
+                # the middle of it.
+                arrival = (last_poll + frame_start) / 2
+            last_poll = frame_start
+            
+            handled_events = 0
+            for event in events:
+                if event.type == pygame.NOEVENT:
+                    # waiting timed out
+                    continue
+                handled_events += 1
+                self._handle_event(event)
+            if self.board.unfinished:
+                self._continue_reveal()
+            
+            # Make the most recently drawn parts of screen visible.
+            update_start = perf_counter()
+            dirty_rects = self.dirty_rects.pop_rects(self.screen.get_rect())
+            overlay = None
+            if profiler.enabled and self.settings.profile_overlay:
+                # Overlay is drawn over the game only until it's displayed.
+                overlay = profiler.draw_overlay(self.screen,
+                    self.settings.profile_overlay_interval)
+                dirty_rects.append(overlay[0])
+            if dirty_rects:
+                pygame.display.update(dirty_rects)
+            if overlay:
+                self.screen.blit(overlay[1], overlay[0])
+            
+            end_time = perf_counter()
+            for _ in range(handled_events):
+                self.event_latency.record(end_time - arrival)
+            if profiler.enabled:
+                profiler.record('events', update_start - frame_start)
+                profiler.record('display_update', end_time - update_start)
+                profiler.record('frame', end_time - frame_start)
+                profiler.dump_if_due(self.settings.profile_dump_interval)
+            
+            if not self.settings.event_driven:
+                # Limit game's fps
+                self.clock.tick(self.settings.fps)
+        
+        if self.settings.print_latency:
+            print(self.event_latency.summary())
+        if profiler.enabled:
+            print(profiler.summary())
+        if self.recorder:
+            self.recorder.close()
+        self.no_guess_pool.close()
+
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Play Minesweeper.')
+    parser.add_argument('--record', metavar='LOG',
+        help='append all clicks into replay log')
+    parser.add_argument('--replay', metavar='LOG',
+        help='play games from replay log before the game starts')
+    parser.add_argument('--fast', action='store_true',
+        help='replay as fast as possible instead of in real time')
+    parser.add_argument('--no-guess', action='store_true',
+        help='play only boards which can be cleared without guessing')
+    parser.add_argument('--endless', action='store_true',
+        help='play on endless minefield generated as it is uncovered')
+    parser.add_argument('--profile', action='store_true',
+        help='measure and show durations of drawing and main loop phases')
+    args = parser.parse_args()
+    if args.profile:
+        profiler.enabled = True
+    
     # Make the game instance and run the game.
     game = Minesweeper()
-    game.run_game()
\ No newline at end of file
+    if args.endless:
+        game.settings = Settings(diff='endless')
+        game.__init__(first_init=False)
+    if args.no_guess:
+        game.settings.no_guess = True
+        game.fill_no_guess_pool()
+    if args.replay:
+        game.play_replay(args.replay, realtime=not args.fast)
+        game.run_game(new_game=False)
+    else:
+        if args.record:
+            game.recorder = ReplayRecorder(args.record)
+        game.run_game()
\ No newline at end of file
@@ -0,0 +1,55 @@
+# Neighbor indexes are the same for every board of given size, so boards of
+# the same size share one.
+_index_cache = {}
+
+class NeighborIndex:
+    """Class computing adjacency of boxes of the board. Boxes are referenced
+    by flat integer index (row * columns + column). Neighbors aren't stored;
+    they're derived from the index, which is as fast as looking them up in
+    a table and doesn't take any memory per box."""
+    def __init__(self, columns, rows):
+        """Initialize index for the board of given size."""
+        self.columns = columns
+        self.rows = rows
+        self.size = columns * rows
+        # Boxes from index last_row_start on are in the last row.
+        self.last_row_start = self.size - columns
+
+    def adjacent(self, idx):
+        """Return flat indexes of all boxes adjacent to box with index idx."""
+        columns = self.columns
+        column = idx % columns
+        if 0 < column < columns - 1 and columns <= idx < self.last_row_start:
+            # Box isn't on the edge, so it has all eight neighbors.
+            above = idx - columns
+            below = idx + columns
+            return (above - 1, above, above + 1, idx - 1, idx + 1,
+                below - 1, below, below + 1)
+
+        row = idx // columns
+        adjacent = []
+        for adj_row in (row - 1, row, row + 1):
+            if adj_row < 0 or adj_row >= self.rows:
+                continue
+            for adj_column in (column - 1, column, column + 1):
+                if adj_column < 0 or adj_column >= columns:
+                    continue
+                if adj_row == row and adj_column == column:
+                    continue
+                adjacent.append(adj_row * columns + adj_column)
+        return adjacent
+
+    def to_index(self, row, column):
+        """Convert row and column to flat index."""
+        return row * self.columns + column
+
+    def to_position(self, idx):
+        """Convert flat index to (row, column) tuple."""
+        return divmod(idx, self.columns)
+
+def get_neighbor_index(columns, rows):
+    """Return NeighborIndex for board of given size."""
+    key = (columns, rows)
+    if key not in _index_cache:
+        _index_cache[key] = NeighborIndex(columns, rows)
+    return _index_cache[key]
@@ -0,0 +1,99 @@
+from collections import deque
+from multiprocessing import get_context, TimeoutError
+from random import Random, randrange
+
+from board_format import decode_board, encode_board
+from engine import Board
+from solver import Solver
+
+# Boards tried before generator gives up (for too dense boards).
+MAX_ATTEMPTS = 20000
+
+def can_be_cleared(board, start_idx):
+    """Return True if solver.Solver uncovers all boxes without mine of board
+    with placed mines, starting by uncovering box start_idx. Board is played
+    on, so it shouldn't be used for anything else afterwards."""
+    solver = Solver(board)
+    solver.update(board.uncover(start_idx))
+    while not board.is_over():
+        safe = solver.solve()[0]
+        if not safe:
+            return False
+        for idx in list(safe):
+            solver.update(board.uncover(idx))
+    return board.all_safe_uncovered()
+
+def generate_board(columns, rows, mines, safe_zone='neighbors', seed=None,
+    start_idx=None, max_attempts=MAX_ATTEMPTS):
+    """Return Board with mines placed which can be cleared without guessing
+    from box board.first_idx. If start_idx is None, start box is picked
+    randomly. Returns None if no such board was found in max_attempts."""
+    rng = Random(seed)
+    size = columns * rows
+    for attempt in range(max_attempts):
+        attempt_seed = rng.randrange(2**32)
+        first_idx = start_idx if start_idx is not None else rng.randrange(size)
+        board = Board(columns, rows, mines, safe_zone, attempt_seed)
+        board.place_mines(first_idx)
+        if can_be_cleared(board, first_idx):
+            # Mines are placed the same way again into untouched board.
+            board = Board(columns, rows, mines, safe_zone, attempt_seed)
+            board.place_mines(first_idx)
+            return board
+    return None
+
+def _generate_data(task):
+    """Generate board in worker process and return it serialized (or None)."""
+    board = generate_board(*task)
+    return encode_board(board) if board is not None else None
+
+class NoGuessPool:
+    """Class generating boards which can be cleared without guessing in
+    background processes. For each board size it keeps bounded queue of
+    boards which are ready (or being generated), so getting one is usually
+    instant."""
+    def __init__(self, queue_size=3, processes=None):
+        """Initialize pool. Worker processes are started on first use."""
+        self.queue_size = queue_size
+        self.processes = processes
+        self.pool = None
+        self.queues = {}        # (columns, rows, mines, safe_zone): deque of results
+
+    def fill(self, columns, rows, mines, safe_zone='neighbors'):
+        """Start generating boards of given size until its queue is full."""
+        if self.pool is None:
+            # Workers are started fresh, not forked from the game, which has
+            # pygame (and its signal handlers) initialized.
+            self.pool = get_context('spawn').Pool(self.processes)
+        key = (columns, rows, mines, safe_zone)
+        queue = self.queues.setdefault(key, deque())
+        while len(queue) < self.queue_size:
+            task = key + (randrange(2**32),)
+            queue.append(self.pool.apply_async(_generate_data, (task,)))
+
+    def get(self, columns, rows, mines, safe_zone='neighbors', timeout=None):
+        """Return Board of given size which can be cleared without guessing.
+        Board which is already generated is preferred; if there isn't any,
+        it waits for one at most timeout seconds (None means forever).
+        Returns None if generator gave up or didn't finish in time. Result
+        which didn't finish is dropped and already replaced in the queue, so
+        other sizes and boards being generated are kept."""
+        self.fill(columns, rows, mines, safe_zone)
+        queue = self.queues[(columns, rows, mines, safe_zone)]
+        result = next((result for result in queue if result.ready()), queue[0])
+        queue.remove(result)
+        self.fill(columns, rows, mines, safe_zone)
+
+        try:
+            data = result.get(timeout)
+        except TimeoutError:
+            return None
+        return decode_board(data) if data is not None else None
+
+    def close(self):
+        """Stop worker processes."""
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+            self.queues = {}
@@ -0,0 +1,30 @@
+import pygame
+
+# Colors of numbers showing how many adjacent mines box has.
+NUMBER_COLORS = {
+    1: (0, 0, 255),         # blue
+    2: (0, 130, 0),         # green
+    3: (255, 0, 0),         # red
+    4: (0, 0, 150),         # dark blue
+    5: (140, 0, 0),         # dark red
+    6: (0, 140, 140),       # wierd green
+    7: (140, 0, 140),       # purple
+    8: (30, 30, 30),        # black
+}
+
+# Rendered numbers are shared by all boxes. Key is (box size, bg color), so
+# when those settings change, new numbers are rendered.
+_glyph_cache = {}
+
+def get_number_glyphs(settings):
+    """Return dictionary of rendered numbers 1-8 (number: surface) for given
+    settings. Numbers are rendered only the first time they are asked for."""
+    key = (settings.box_width, settings.box_height, settings.bg_color)
+    glyphs = _glyph_cache.get(key)
+    if glyphs is None:
+        font = pygame.font.SysFont('tahoma', 24, bold=True)
+        glyphs = {}
+        for num, color in NUMBER_COLORS.items():
+            glyphs[num] = font.render(str(num), True, color, settings.bg_color)
+        _glyph_cache[key] = glyphs
+    return glyphs
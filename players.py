@@ -0,0 +1,115 @@
+from random import Random
+
+from probability import mine_probabilities
+from solver import Solver
+
+class RandomPlayer:
+    """Automated player uncovering random covered boxes until the game is
+    over. It never marks mines."""
+    def __init__(self, seed=None):
+        """Initialize player with its own random generator."""
+        self.rng = Random(seed)
+        self.order = None
+    
+    def next_move(self, board):
+        """Return next move as tuple (action, idx), where action is either
+        'uncover' or 'mark', or None if player has no move to make."""
+        if self.order is None:
+            # Boxes are visited in random order, each at most once.
+            self.order = list(range(board.size))
+            self.rng.shuffle(self.order)
+        
+        while self.order:
+            idx = self.order.pop()
+            if board.covered[idx] and not board.marked[idx]:
+                return 'uncover', idx
+        return None
+    
+    def update(self, action, idx, uncovered_idxs):
+        """Let player know result of its last move."""
+        pass
+
+class SolverPlayer(RandomPlayer):
+    """Automated player uncovering boxes which solver.Solver finds safe. When
+    there is no such box, random box that isn't known to have mine is
+    uncovered."""
+    def __init__(self, seed=None):
+        """Initialize player."""
+        super().__init__(seed)
+        self.solver = None
+    
+    def next_move(self, board):
+        """Return next move as tuple (action, idx) or None."""
+        if self.solver is None:
+            self.solver = Solver(board)
+        
+        safe, mines = self.solver.solve()
+        if safe:
+            return 'uncover', next(iter(safe))
+        
+        # Nothing is certain; guess.
+        while True:
+            move = super().next_move(board)
+            if move is None or move[1] not in mines:
+                return move
+    
+    def update(self, action, idx, uncovered_idxs):
+        """Let solver know which boxes were uncovered."""
+        if self.solver is not None:
+            self.solver.update(uncovered_idxs)
+
+class ProbabilityPlayer(SolverPlayer):
+    """Automated player uncovering boxes which solver.Solver finds safe. When
+    there is no such box, box least likely to have mine (according to
+    probability.mine_probabilities) is uncovered."""
+    def __init__(self, seed=None, time_budget=1.0):
+        """Initialize player. time_budget limits seconds spent on computing
+        probabilities of one guess."""
+        super().__init__(seed)
+        self.time_budget = time_budget
+    
+    def next_move(self, board):
+        """Return next move as tuple (action, idx) or None."""
+        if self.solver is None:
+            self.solver = Solver(board)
+        
+        safe, mines = self.solver.solve()
+        if safe:
+            return 'uncover', next(iter(safe))
+        
+        probabilities = mine_probabilities(board, mines, safe,
+            time_budget=self.time_budget, seed=self.rng.random())[0]
+        candidates = [idx for idx in probabilities if idx not in mines]
+        if not candidates:
+            return None
+        # Ties are broken randomly, so the player isn't biased to any corner.
+        self.rng.shuffle(candidates)
+        return 'uncover', min(candidates, key=probabilities.get)
+
+# Players which can be chosen by name (name: class).
+PLAYERS = {
+    'random': RandomPlayer,
+    'solver': SolverPlayer,
+    'probability': ProbabilityPlayer,
+}
+
+def play_game(board, player, max_moves=None):
+    """Let player play the game on given board until it's over. Returns number
+    of moves (clicks) player made."""
+    moves = 0
+    while not board.is_over():
+        if max_moves is not None and moves >= max_moves:
+            break
+        move = player.next_move(board)
+        if move is None:
+            break
+        
+        action, idx = move
+        uncovered_idxs = []
+        if action == 'uncover':
+            uncovered_idxs = board.uncover(idx)
+        elif action == 'mark':
+            board.mark(idx)
+        player.update(action, idx, uncovered_idxs)
+        moves += 1
+    return moves
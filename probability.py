@@ -0,0 +1,343 @@
+from random import Random
+from time import perf_counter
+
+# Components with more boxes are never enumerated exactly.
+MAX_EXACT_BOXES = 400
+# Share of time budget for exact counting; the rest is left for sampling
+# components which couldn't be counted.
+EXACT_SHARE = 0.75
+
+class _BudgetExceeded(Exception):
+    """Raised when exact enumeration runs out of time."""
+    pass
+
+def mine_probabilities(board, known_mines=(), known_safe=(), mines_left=None,
+    time_budget=1.0, samples=2000, seed=None):
+    """Return tuple (dictionary box index: probability that box has mine,
+    True if probabilities are exact) for every covered box of engine.Board.
+
+    Covered boxes next to uncovered numbers (the frontier) are split into
+    independent components. Valid mine configurations of each component are
+    counted with memoization and components are combined weighted by the
+    number of ways left mines fit into the other covered boxes. mines_left
+    is number of mines in covered boxes which aren't in known_mines (by
+    default all mines minus known_mines). If exact counting takes longer
+    than EXACT_SHARE of time_budget seconds, the remaining components are
+    estimated from random valid configurations in the rest of it. Budget is
+    shared by all components and also covers scanning the board."""
+    start = perf_counter()
+    known_mines = set(known_mines)
+    known_safe = set(known_safe)
+    if mines_left is None:
+        mines_left = board.mines - len(known_mines)
+
+    constraints = _get_constraints(board, known_mines, known_safe)
+    unknown = [idx for idx in range(board.size) if board.covered[idx]
+        and idx not in known_mines and idx not in known_safe]
+    frontier = set()
+    for cells, remaining in constraints:
+        frontier.update(cells)
+    others = len(unknown) - len(frontier)
+
+    # Writing out probabilities of all boxes takes about as long as scanning
+    # them did, so both are taken from the budget before counting.
+    scan_time = perf_counter() - start
+    counting_budget = max(time_budget - 2 * scan_time, 0.0)
+    exact_deadline = start + scan_time + counting_budget * EXACT_SHARE
+    deadline = start + scan_time + counting_budget
+
+    # Count configurations of each component.
+    rng = Random(seed)
+    exact = True
+    distributions = []
+    for cells, component_constraints in sorted(
+        _split_components(constraints), key=lambda component: len(component[0])):
+        distribution = None
+        if exact and len(cells) <= MAX_EXACT_BOXES:
+            try:
+                distribution = _count_configurations(cells,
+                    component_constraints, exact_deadline)
+            except _BudgetExceeded:
+                exact = False
+        if distribution is None:
+            exact = False
+            distribution = _sample_configurations(cells, component_constraints,
+                samples, rng, deadline)
+        distributions.append((cells, distribution))
+
+    probabilities = _combine(distributions, others, mines_left)
+    if others:
+        other_probability = probabilities.pop(None)
+        for idx in unknown:
+            if idx not in frontier:
+                probabilities[idx] = other_probability
+    else:
+        probabilities.pop(None, None)
+
+    for idx in known_mines:
+        probabilities[idx] = 1.0
+    for idx in known_safe:
+        probabilities[idx] = 0.0
+    return probabilities, exact
+
+def _get_constraints(board, known_mines, known_safe):
+    """Return list of tuples (tuple of unknown boxes, number of mines in
+    them) for each uncovered number next to unknown box."""
+    constraints = []
+    covered = board.covered
+    for idx in range(board.size):
+        if covered[idx] or not board.adjacent_mines[idx]:
+            continue
+        cells = []
+        remaining = board.adjacent_mines[idx]
+        for adj_idx in board.neighbor_index.adjacent(idx):
+            if not covered[adj_idx] or adj_idx in known_safe:
+                continue
+            if adj_idx in known_mines:
+                remaining -= 1
+            else:
+                cells.append(adj_idx)
+        if cells:
+            constraints.append((tuple(cells), remaining))
+    return constraints
+
+def _split_components(constraints):
+    """Split constraints into groups not sharing any box. Returns list of
+    tuples (ordered list of boxes, list of constraints)."""
+    parent = {}
+    def find(idx):
+        while parent[idx] != idx:
+            parent[idx] = parent[parent[idx]]
+            idx = parent[idx]
+        return idx
+
+    for cells, remaining in constraints:
+        for idx in cells:
+            parent.setdefault(idx, idx)
+        root = find(cells[0])
+        for idx in cells[1:]:
+            parent[find(idx)] = root
+
+    components = {}
+    for constraint in constraints:
+        components.setdefault(find(constraint[0][0]), []).append(constraint)
+
+    result = []
+    for component_constraints in components.values():
+        # Boxes are ordered as constraints go, so that only few constraints
+        # are partially assigned at any time.
+        cells = []
+        seen = set()
+        for constraint_cells, remaining in component_constraints:
+            for idx in constraint_cells:
+                if idx not in seen:
+                    seen.add(idx)
+                    cells.append(idx)
+        result.append((cells, component_constraints))
+    return result
+
+def _count_configurations(cells, constraints, deadline):
+    """Return dictionary (number of mines: [number of configurations, list of
+    numbers of configurations with mine in each box]) of component."""
+    num_cells = len(cells)
+    position = {idx: pos for pos, idx in enumerate(cells)}
+    cell_constraints = [[] for _ in range(num_cells)]
+    first = []
+    last = []
+    remaining = []
+    for num, (constraint_cells, constraint_remaining) in enumerate(constraints):
+        positions = [position[idx] for idx in constraint_cells]
+        for pos in positions:
+            cell_constraints[pos].append(num)
+        first.append(min(positions))
+        last.append(max(positions))
+        remaining.append(constraint_remaining)
+
+    # Constraints partially assigned before each position; only their
+    # remaining mines matter for the rest of the boxes.
+    open_constraints = [[num for num in range(len(constraints))
+        if first[num] < pos <= last[num]] for pos in range(num_cells + 1)]
+    # Number of boxes of each constraint after given position.
+    boxes_after = [[sum(1 for p in range(pos + 1, num_cells) if num in cell_constraints[p])
+        for num in cell_constraints[pos]] for pos in range(num_cells)]
+
+    memo = {}
+    def count(pos):
+        key = (pos, tuple(remaining[num] for num in open_constraints[pos]))
+        result = memo.get(key)
+        if result is not None:
+            return result
+        if perf_counter() > deadline:
+            raise _BudgetExceeded
+
+        if pos == num_cells:
+            result = {0: [1, []]}
+        else:
+            result = {}
+            for value in (0, 1):
+                valid = True
+                for num, after in zip(cell_constraints[pos], boxes_after[pos]):
+                    remaining[num] -= value
+                    if remaining[num] < 0 or remaining[num] > after:
+                        valid = False
+                if valid:
+                    for mines, (ways, cell_counts) in count(pos + 1).items():
+                        entry = result.get(mines + value)
+                        if entry is None:
+                            result[mines + value] = [ways, [ways * value] + cell_counts]
+                        else:
+                            entry[0] += ways
+                            entry_counts = entry[1]
+                            entry_counts[0] += ways * value
+                            for i, cell_count in enumerate(cell_counts, 1):
+                                entry_counts[i] += cell_count
+                for num in cell_constraints[pos]:
+                    remaining[num] += value
+
+        memo[key] = result
+        return result
+
+    return count(0)
+
+def _sample_configurations(cells, constraints, samples, rng, deadline):
+    """Estimate the same dictionary as _count_configurations from random
+    valid configurations found by randomized backtracking. Configurations
+    are not picked exactly uniformly, so result is only approximate."""
+    num_cells = len(cells)
+    position = {idx: pos for pos, idx in enumerate(cells)}
+    cell_constraints = [[] for _ in range(num_cells)]
+    boxes_left = []
+    for num, (constraint_cells, constraint_remaining) in enumerate(constraints):
+        for idx in constraint_cells:
+            cell_constraints[position[idx]].append(num)
+        boxes_left.append(len(constraint_cells))
+    initial_remaining = [constraint[1] for constraint in constraints]
+
+    result = {}
+    for sample in range(samples):
+        if perf_counter() > deadline:
+            break
+        remaining = list(initial_remaining)
+        left = list(boxes_left)
+        values = [0] * num_cells
+        if not _assign(0, values, remaining, left, cell_constraints, rng, deadline):
+            continue
+        mines = sum(values)
+        entry = result.setdefault(mines, [0, [0] * num_cells])
+        entry[0] += 1
+        for pos, value in enumerate(values):
+            entry[1][pos] += value
+
+    if not result:
+        # Not a single configuration was found in time; assume every box is
+        # as likely to have mine as the constraints say on average.
+        # Counts are kept integers (scaled by num_cells), as they're later
+        # multiplied by numbers too big for float.
+        mines = round(sum(initial_remaining) * num_cells / max(sum(boxes_left), 1))
+        result[mines] = [num_cells, [mines] * num_cells]
+    return result
+
+def _assign(pos, values, remaining, left, cell_constraints, rng, deadline):
+    """Assign random valid values to boxes from pos on. Returns True if
+    valid configuration was found."""
+    # Iterative backtracking, so big components don't hit recursion limit.
+    choices = [None] * len(values)
+    while 0 <= pos < len(values):
+        if choices[pos] is None:
+            choices[pos] = [1, 0] if rng.random() < 0.5 else [0, 1]
+        else:
+            # Undo previous value of this box.
+            for num in cell_constraints[pos]:
+                remaining[num] += values[pos]
+                left[num] += 1
+
+        if not choices[pos]:
+            choices[pos] = None
+            pos -= 1
+            continue
+        if perf_counter() > deadline:
+            return False
+
+        value = choices[pos].pop()
+        valid = True
+        for num in cell_constraints[pos]:
+            remaining[num] -= value
+            left[num] -= 1
+            if remaining[num] < 0 or remaining[num] > left[num]:
+                valid = False
+        values[pos] = value
+        if valid:
+            pos += 1
+        # If not valid, the value is undone on the next pass at this pos.
+    return pos == len(values)
+
+def _combine(distributions, others, mines_left):
+    """Combine distributions of components with the number of ways the rest
+    of mines can be placed into other boxes. Returns dictionary box index:
+    probability; key None holds probability of boxes outside components."""
+    def convolve(first, second):
+        """Return ways of numbers of mines of two independent groups of
+        boxes together; both take and return dictionary mines: ways."""
+        total = {}
+        for mines, ways in first.items():
+            for other_mines, other_ways in second.items():
+                key = mines + other_mines
+                total[key] = total.get(key, 0) + ways * other_ways
+        return total
+
+    # Mines of all components before and after each component, so that the
+    # components other than one are combined by a single convolution.
+    ways_by_mines = [{mines: entry[0] for mines, entry in dist.items()}
+        for cells, dist in distributions]
+    before = [{0: 1}]
+    for ways in ways_by_mines:
+        before.append(convolve(before[-1], ways))
+    after = [{0: 1}]
+    for ways in reversed(ways_by_mines):
+        after.append(convolve(after[-1], ways))
+    after.reverse()
+
+    # Binomial coefficients of big boards are huge and slow to compute, but
+    # only their ratios matter. Ways for rest of mines are kept proportional
+    # to comb(others, rest), each computed from the previous one as
+    # comb(n, k + 1) = comb(n, k) * (n - k) / (k + 1), so they stay small.
+    all_mines = before[-1]
+    low = max(0, mines_left - max(all_mines))
+    high = min(others, mines_left - min(all_mines))
+    rest_ways_by_rest = {}
+    ways = 1
+    for rest in range(low + 1, high + 1):
+        ways *= rest
+    for rest in range(low, high + 1):
+        rest_ways_by_rest[rest] = ways
+        ways = ways // (rest + 1) * (others - rest)
+    def rest_ways(mines):
+        return rest_ways_by_rest.get(mines_left - mines, 0)
+
+    weight = sum(ways * rest_ways(mines) for mines, ways in all_mines.items())
+    probabilities = {}
+    if not weight:
+        # Board is inconsistent (for example wrong number of mines left).
+        for cells, dist in distributions:
+            for idx in cells:
+                probabilities[idx] = 0.5
+        probabilities[None] = 0.5
+        return probabilities
+
+    for num, (cells, dist) in enumerate(distributions):
+        rest = convolve(before[num], after[num + 1])
+        cell_weights = [0] * len(cells)
+        for component_mines, (component_ways, counts) in dist.items():
+            factor = sum(ways * rest_ways(component_mines + mines)
+                for mines, ways in rest.items())
+            for pos, count in enumerate(counts):
+                cell_weights[pos] += count * factor
+        for idx, cell_weight in zip(cells, cell_weights):
+            probabilities[idx] = cell_weight / weight
+
+    if others:
+        expected = sum(ways * rest_ways(mines) * (mines_left - mines)
+            for mines, ways in all_mines.items())
+        # Both numbers can be too big for float, but their ratio isn't.
+        probabilities[None] = expected / (others * weight)
+    return probabilities
@@ -0,0 +1,123 @@
+import os
+from array import array
+from functools import wraps
+from time import perf_counter
+
+import pygame
+
+class RingBuffer:
+    """Fixed size buffer of floats keeping only the latest values."""
+    def __init__(self, size=1024):
+        """Initialize empty buffer."""
+        self.size = size
+        self.values = array('d', bytes(8 * size))
+        self.count = 0          # number of values ever added
+
+    def add(self, value):
+        """Add value, overwriting the oldest one if buffer is full."""
+        self.values[self.count % self.size] = value
+        self.count += 1
+
+    def get_values(self):
+        """Return list of values kept in buffer."""
+        return list(self.values[:min(self.count, self.size)])
+
+def percentiles(values, ranks=(50, 95, 99)):
+    """Return list of percentiles (nearest rank) of given values."""
+    values = sorted(values)
+    if not values:
+        return [0.0 for rank in ranks]
+    return [values[min(len(values) - 1, int(len(values) * rank / 100))]
+        for rank in ranks]
+
+class Profiler:
+    """Class collecting durations of game loop phases and of drawing
+    functions into ring buffers. Nothing is measured unless it's enabled."""
+    def __init__(self, enabled=False, size=1024):
+        """Initialize profiler with no measurements."""
+        self.enabled = enabled
+        self.size = size
+        self.buffers = {}       # name: RingBuffer of durations in seconds
+        self.last_dump = perf_counter()
+        self.font = None
+        self.overlay = None     # rendered overlay surface
+        self.last_overlay = 0.0 # time when overlay was rendered
+
+    def record(self, name, duration):
+        """Add one duration (in seconds) of phase or function name."""
+        buffer = self.buffers.get(name)
+        if buffer is None:
+            buffer = self.buffers[name] = RingBuffer(self.size)
+        buffer.add(duration)
+
+    def timed(self, name):
+        """Return decorator recording duration of every call of decorated
+        function under given name while profiler is enabled."""
+        def decorate(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = perf_counter()
+                result = func(*args, **kwargs)
+                self.record(name, perf_counter() - start)
+                return result
+            return wrapper
+        return decorate
+
+    def stats(self):
+        """Return list of tuples (name, count, p50, p95, p99) with times in
+        milliseconds."""
+        stats = []
+        for name, buffer in self.buffers.items():
+            p50, p95, p99 = percentiles(buffer.get_values())
+            stats.append((name, buffer.count, p50 * 1000, p95 * 1000, p99 * 1000))
+        return stats
+
+    def summary(self):
+        """Return string with percentiles of every measured phase."""
+        lines = [f"{'':<24}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"]
+        for name, count, p50, p95, p99 in self.stats():
+            lines.append(f'{name:<24}{count:>8}{p50:>10.3f}{p95:>10.3f}{p99:>10.3f}')
+        return '\n'.join(lines)
+
+    def dump_if_due(self, interval):
+        """Print summary if interval seconds passed since the last one."""
+        if perf_counter() - self.last_dump >= interval:
+            self.last_dump = perf_counter()
+            print(self.summary(), flush=True)
+
+    def draw_overlay(self, screen, interval=1.0):
+        """Draw summary into top left corner of screen. Returns tuple (rect
+        of overlay, copy of screen which was under it), so the screen can be
+        restored after it's displayed. Summary is rendered again only if
+        interval seconds passed since the last time, so the overlay doesn't
+        slow down the frames it measures."""
+        if self.overlay is None or perf_counter() - self.last_overlay >= interval:
+            self.last_overlay = perf_counter()
+            self.overlay = self._render_overlay()
+        rect = self.overlay.get_rect().clip(screen.get_rect())
+
+        saved = screen.subsurface(rect).copy()
+        screen.blit(self.overlay, rect)
+        return rect, saved
+
+    def _render_overlay(self):
+        """Return surface with rendered summary on half transparent background."""
+        if self.font is None:
+            self.font = pygame.font.Font(None, 18)
+        texts = [self.font.render(line, True, (255, 255, 255))
+            for line in self.summary().split('\n')]
+        line_height = self.font.get_linesize()
+        width = max(text.get_width() for text in texts) + 8
+        overlay = pygame.Surface((width, line_height * len(texts) + 8),
+            pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 200))
+        for num, text in enumerate(texts):
+            overlay.blit(text, (4, 4 + num * line_height))
+        return overlay
+
+# Profiler used by the game. It can be enabled by MINESWEEPER_PROFILE
+# environment variable (or settings.profile or --profile).
+profiler = Profiler(enabled=os.environ.get('MINESWEEPER_PROFILE', '').strip().lower()
+    not in ('', '0', 'false', 'no', 'off'))
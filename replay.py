@@ -0,0 +1,133 @@
+import argparse
+import struct
+from time import perf_counter
+
+from board_format import decode_header, encode_board
+from engine import Board
+
+# Replay log starts with magic and version, then records follow. Every record
+# is type, time (ms since start of its game) and box index. NEW_GAME record
+# is followed by serialized board (without mines, they are placed from seed)
+# and its index holds the length of it.
+FILE_HEADER = struct.Struct('<4sB')
+MAGIC = b'MSWL'
+VERSION = 1
+RECORD = struct.Struct('<BIi')
+
+NEW_GAME = 0
+UNCOVER = 1
+MARK = 2
+RESTART = 3
+
+class ReplayRecorder:
+    """Class appending player's inputs into binary replay log."""
+    def __init__(self, path):
+        """Open replay log for appending."""
+        self.file = open(path, 'ab')
+        if self.file.tell() == 0:
+            self.file.write(FILE_HEADER.pack(MAGIC, VERSION))
+        self.game_start = perf_counter()
+
+    def start_game(self, board):
+        """Record start of new game on given board. Board must already know
+        its seed."""
+        self.game_start = perf_counter()
+        board_data = encode_board(board, include_mines=False)
+        self.file.write(RECORD.pack(NEW_GAME, 0, len(board_data)))
+        self.file.write(board_data)
+
+    def record(self, action, idx=-1):
+        """Record one input (UNCOVER, MARK or RESTART) of the current game."""
+        time_ms = int((perf_counter() - self.game_start) * 1000)
+        self.file.write(RECORD.pack(action, time_ms, idx))
+
+    def flush(self):
+        """Write buffered records to disk."""
+        self.file.flush()
+
+    def close(self):
+        """Close replay log."""
+        self.file.close()
+
+def read_replay(path):
+    """Yield records of replay log as tuples (action, time_ms, idx, board).
+    board is dictionary from board_format.decode_header for NEW_GAME records
+    and None for others."""
+    with open(path, 'rb') as file:
+        magic, version = FILE_HEADER.unpack(file.read(FILE_HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{path} is not a minesweeper replay log.')
+
+        while True:
+            data = file.read(RECORD.size)
+            if len(data) < RECORD.size:
+                # end of log (or record that wasn't written completely)
+                return
+            action, time_ms, idx = RECORD.unpack(data)
+            board = None
+            if action == NEW_GAME:
+                board_data = file.read(idx)
+                if len(board_data) < idx:
+                    return
+                board = decode_header(board_data)
+            yield action, time_ms, idx, board
+
+def replay_headless(path):
+    """Play recorded games on headless boards as fast as possible. Returns
+    list of dictionaries describing result of each game, including the
+    played board."""
+    results = []
+    board = None
+    for action, time_ms, idx, header in read_replay(path):
+        if action == NEW_GAME:
+            board = Board(header['columns'], header['rows'], header['mines'],
+                header['safe_zone'], header['seed'])
+            if header['first_idx'] is not None:
+                # Mines were placed before the game started (no guess mode).
+                board.place_mines(header['first_idx'])
+            results.append({'columns': board.columns, 'rows': board.rows,
+                'mines': board.mines, 'seed': board.seed, 'moves': 0,
+                'time_ms': 0, 'won': False, 'lost': False, 'board': board})
+            continue
+
+        if board is None or action == RESTART:
+            continue
+        if action == UNCOVER:
+            board.uncover(idx)
+        elif action == MARK:
+            if board.marked[idx]:
+                board.unmark(idx)
+            else:
+                board.mark(idx)
+
+        result = results[-1]
+        result['moves'] += 1
+        result['time_ms'] = time_ms
+        result['won'] = board.is_won()
+        result['lost'] = board.lost
+    return results
+
+def main(argv=None):
+    """Replay log without display and print result of every game."""
+    parser = argparse.ArgumentParser(description='Replay recorded games of '
+        'minesweeper without display.')
+    parser.add_argument('log', help='replay log recorded by minesweeper.py --record')
+    args = parser.parse_args(argv)
+
+    start = perf_counter()
+    results = replay_headless(args.log)
+    duration = perf_counter() - start
+    for num, result in enumerate(results):
+        if result['won']:
+            state = 'won'
+        elif result['lost']:
+            state = 'lost'
+        else:
+            state = 'unfinished'
+        print(f"game {num}: {result['columns']}x{result['rows']} "
+            f"{result['mines']} mines, seed {result['seed']}, "
+            f"{result['moves']} moves, {result['time_ms']/1000:.1f} s, {state}")
+    print(f'{len(results)} games replayed in {duration*1000:.1f} ms')
+
+if __name__ == '__main__':
+    main()
@@ -34,6 +34,7 @@ class RestartButton():
         self.sprite_group.add(img)
         self.sprite_group.draw(self.screen)
         self.sprite_group.empty()
+        self.game.dirty_rects.add(self.rect.inflate(4, 4))
         
     def click(self):
         """Make clicked graphical effect and restart game."""
@@ -56,4 +57,5 @@ class RestartButton():
         self.sprite_group.add(img)
         self.sprite_group.draw(self.screen)
         self.sprite_group.empty()
+        self.game.dirty_rects.add(self.rect)
         
\ No newline at end of file
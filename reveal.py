@@ -0,0 +1,63 @@
+from collections import deque
+
+# Boards with more boxes keep visited boxes in a set instead of bytearray as
+# big as the board (endless boards would need terabytes).
+MAX_DENSE_SIZE = 2**26
+
+def flood_reveal(start, neighbor_index, is_covered, is_empty, limit=None,
+    unfinished=None):
+    """Return list of flat indexes of boxes uncovered by clicking on box with
+    index start. If start box is empty (has no adjacent mines), all connected
+    empty boxes and their borders are uncovered too. is_covered and is_empty
+    are functions taking flat index and returning bool, so this works with
+    any representation of the board. Each box is visited at most once. If
+    limit is given, spreading stops once that many boxes are uncovered;
+    empty boxes whose neighbors weren't visited yet are then appended to
+    list unfinished (if given), so spreading can continue from them later."""
+    revealed = [start]
+    if not is_empty(start):
+        return revealed
+    if neighbor_index.size > MAX_DENSE_SIZE:
+        return _flood_reveal_sparse(revealed, neighbor_index, is_covered,
+            is_empty, limit, unfinished)
+
+    visited = bytearray(neighbor_index.size)
+    visited[start] = 1
+    queue = deque(revealed)
+    while queue:
+        idx = queue.popleft()
+        for adj_idx in neighbor_index.adjacent(idx):
+            if visited[adj_idx] or not is_covered(adj_idx):
+                continue
+            visited[adj_idx] = 1
+            revealed.append(adj_idx)
+            if is_empty(adj_idx):
+                queue.append(adj_idx)
+        if limit is not None and len(revealed) >= limit:
+            break
+
+    if unfinished is not None:
+        unfinished.extend(queue)
+    return revealed
+
+def _flood_reveal_sparse(revealed, neighbor_index, is_covered, is_empty, limit,
+    unfinished):
+    """Flood fill of flood_reveal for huge boards, remembering visited boxes
+    in a set."""
+    visited = set(revealed)
+    queue = deque(revealed)
+    while queue:
+        idx = queue.popleft()
+        for adj_idx in neighbor_index.adjacent(idx):
+            if adj_idx in visited or not is_covered(adj_idx):
+                continue
+            visited.add(adj_idx)
+            revealed.append(adj_idx)
+            if is_empty(adj_idx):
+                queue.append(adj_idx)
+        if limit is not None and len(revealed) >= limit:
+            break
+
+    if unfinished is not None:
+        unfinished.extend(queue)
+    return revealed
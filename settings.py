@@ -7,17 +7,38 @@ class Settings:
         self.bg_color = (195, 195, 195)
         self.outline_white = (245, 245, 245)
         self.outline_grey = (120, 120, 120)
+        self.hint_color = (150, 230, 150)   # overlay color of box shown as hint
+        self.wrong_mark_color = (255, 150, 150) # wrongly marked boxes after loss
+        self.guess_hint_color = (230, 220, 140) # hint when no box is certainly safe
         
         # Single box of mine field settings
         self.box_width = 30
         self.box_height = self.box_width
         
         # Mine field settings
-        self.max_columns = 60   # Be careful about raising max numbers, app might get really
-        self.min_columns = 9    # slow or even stop responding. Also it might not fit inside
-        self.max_rows = 30      # your screen.
+        self.max_columns = 1000
+        self.min_columns = 9
+        self.max_rows = 1000
         self.min_rows = 9
+        self.view_columns = 60  # Bigger boards are shown only partly and can be
+        self.view_rows = 30     # panned. Be careful about raising view numbers,
+                                # game window might not fit inside your screen.
+        self.pan_step = 10      # columns or rows panned by one key press with shift
         self.max_ratio = 8.1 # number of boxes (columns*rows) / number of mines
+        self.safe_zone = 'neighbors'    # boxes without mine around first click;
+                                        # either 'cell' or 'neighbors'
+        self.seed = None     # seed for placing mines; None means random board
+        self.use_numpy = True   # count adjacent mines with NumPy if it's installed
+        self.bitboard = False   # keep state of boxes in bitboards (for small boards)
+        self.hint_time_budget = 0.5 # seconds for computing mine probabilities
+        self.no_guess = False   # only boards which can be cleared without guessing
+        self.no_guess_queue_size = 3    # boards generated in advance for each size
+        self.no_guess_processes = None  # None means number of CPUs
+        self.no_guess_timeout = 5.0     # seconds to wait for board before
+                                        # falling back to ordinary one
+        self.start_color = (150, 190, 235)  # overlay color of box to start at
+        self.endless_density = 0.16 # share of boxes with mine in endless mode
+        self.max_chunks = 256   # chunks of endless board kept in memory
         
         self.difficulty = diff
         if self.difficulty == 'beginner':
@@ -35,12 +56,28 @@ class Settings:
             self.rows = 16
             self.mines = 99
         
+        # Board generated by chunks as it's panned; mines are placed by density.
+        elif self.difficulty == 'endless':
+            self.columns = 2**20
+            self.rows = 2**20
+            self.mines = 0
+        
         # Those Nones are just placeholders, numbers will be provided by user.
         elif self.difficulty == 'custom':
             self.columns = None
             self.rows = None
             self.mines = None
         
+        # Main loop settings
+        self.event_driven = True    # sleep until event comes instead of polling
+        self.fps = 20               # frames per second when polling
+        self.max_idle_wait = 1000   # longest sleep (ms) when waiting for events
+        self.print_latency = False  # print input latency stats when game ends
+        self.profile = False        # measure phases of main loop and drawing
+        self.profile_overlay = True # show measurements on screen when profiling
+        self.profile_dump_interval = 10 # seconds between printed measurements
+        self.profile_overlay_interval = 1.0 # seconds between overlay refreshes
+        
         # Menu bar settings
         self.menu_height = 20
         self.menu_color = (170, 170, 170)
@@ -0,0 +1,130 @@
+class Solver:
+    """Deterministic solver finding boxes which are certainly safe or certainly
+    contain mine. Every uncovered box with a number is a constraint: its
+    covered adjacent boxes contain exactly that many mines. Constraints are
+    solved one by one (single box rule) and in pairs (subset rule).
+
+    Solver is incremental. Only constraints touched since last solve (by
+    uncovering boxes, marking them or by solver's own deductions) are
+    evaluated again, so no move needs the whole board to be looked at."""
+    def __init__(self, board, trust_marks=False):
+        """Initialize solver for given engine.Board (or ChunkedBoard). If
+        trust_marks is True, boxes marked by player are considered to contain
+        mines."""
+        self.board = board
+        self.neighbor_index = board.neighbor_index
+        self.trust_marks = trust_marks
+
+        self.safe = set()           # covered boxes which certainly don't have mine
+        self.mines = set()          # covered boxes which certainly have mine
+        self.dirty = set()          # constraints which need to be evaluated
+
+        # Board might already be in progress.
+        for idx in board.uncovered_indexes():
+            self._touch_constraint(idx)
+        if trust_marks:
+            self.mines.update(board.marked_indexes())
+
+    def update(self, uncovered_idxs):
+        """Let solver know which boxes were uncovered by last move."""
+        for idx in uncovered_idxs:
+            self.safe.discard(idx)
+            self._touch_constraint(idx)
+            self._touch_neighbors(idx)
+
+    def update_mark(self, idx):
+        """Let solver know that box idx was marked or unmarked."""
+        if not self.trust_marks:
+            return
+        if self.board.marked[idx]:
+            self.mines.add(idx)
+        else:
+            self.mines.discard(idx)
+        self._touch_neighbors(idx)
+
+    def solve(self):
+        """Evaluate all touched constraints until nothing new can be found.
+        Returns tuple of sets (safe boxes, boxes with mines) of all boxes
+        found so far which are still covered."""
+        while self.dirty:
+            idx = self.dirty.pop()
+            unknown, remaining = self._get_constraint(idx)
+            if not unknown:
+                continue
+            if not self._apply_single_rule(unknown, remaining):
+                self._apply_subset_rule(idx, unknown, remaining)
+        return self.safe, self.mines
+
+    def _touch_constraint(self, idx):
+        """Mark constraint of uncovered box idx for evaluation."""
+        if not self.board.covered[idx] and self.board.adjacent_mines[idx]:
+            self.dirty.add(idx)
+
+    def _touch_neighbors(self, idx):
+        """Mark constraints adjacent to box idx for evaluation."""
+        for adj_idx in self.neighbor_index.adjacent(idx):
+            self._touch_constraint(adj_idx)
+
+    def _get_constraint(self, idx):
+        """Return tuple (set of adjacent boxes which are not known yet,
+        number of mines among them) for uncovered box idx."""
+        covered = self.board.covered
+        unknown = set()
+        remaining = self.board.adjacent_mines[idx]
+        for adj_idx in self.neighbor_index.adjacent(idx):
+            if not covered[adj_idx] or adj_idx in self.safe:
+                continue
+            if adj_idx in self.mines:
+                remaining -= 1
+            else:
+                unknown.add(adj_idx)
+        return unknown, remaining
+
+    def _apply_single_rule(self, unknown, remaining):
+        """If all unknown boxes of one constraint are safe or all of them have
+        mines, remember them. Returns True if anything was found."""
+        if remaining == 0:
+            self._add_found(unknown, self.safe)
+            return True
+        elif remaining == len(unknown):
+            self._add_found(unknown, self.mines)
+            return True
+        return False
+
+    def _apply_subset_rule(self, idx, unknown, remaining):
+        """Compare constraint with overlapping constraints. If unknown boxes
+        of one are subset of the other's, mines in the rest of the other's
+        boxes are known. Returns True if anything was found."""
+        others = set()
+        for unknown_idx in unknown:
+            for adj_idx in self.neighbor_index.adjacent(unknown_idx):
+                if adj_idx != idx and not self.board.covered[adj_idx]:
+                    others.add(adj_idx)
+
+        for other_idx in others:
+            if not self.board.adjacent_mines[other_idx]:
+                continue
+            other_unknown, other_remaining = self._get_constraint(other_idx)
+            if unknown < other_unknown:
+                rest = other_unknown - unknown
+                rest_mines = other_remaining - remaining
+            elif other_unknown < unknown:
+                rest = unknown - other_unknown
+                rest_mines = remaining - other_remaining
+            else:
+                continue
+
+            if rest_mines == 0:
+                self._add_found(rest, self.safe)
+                return True
+            elif rest_mines == len(rest):
+                self._add_found(rest, self.mines)
+                return True
+        return False
+
+    def _add_found(self, idxs, found):
+        """Add boxes to found set (safe or mines) and mark constraints
+        affected by them for evaluation."""
+        for idx in idxs:
+            found.add(idx)
+            self._touch_neighbors(idx)
@@ -0,0 +1,15 @@
+from batch_simulator import create_game
+
+def test_first_click_is_independent_of_mines():
+    # Box six boxes after the first click is out of the safe zone, so it
+    # should hold mine as often as any other box: 99 / (480 - 9).
+    games = 0
+    mines = 0
+    for seed in range(3000):
+        board, player = create_game(30, 16, 99, 'random', seed)
+        idx = player.next_move(board)[1]
+        board.uncover(idx)
+        if idx + 6 < board.size:
+            games += 1
+            mines += board.has_mine[idx + 6]
+    assert abs(mines / games - 99 / 471) < 0.04
@@ -0,0 +1,57 @@
+from random import Random
+
+from bitboard import BitBoard
+from engine import Board
+
+def _assert_same(bits, board):
+    """Assert that BitBoard and Board are in the same state."""
+    assert list(bits.covered) == list(board.covered)
+    assert list(bits.marked) == list(board.marked)
+    assert bits.mines_left() == board.mines_left()
+    assert bits.covered_safe_boxes == board.covered_safe_boxes
+    assert bits.all_mines_marked() == board.all_mines_marked()
+    assert bits.all_safe_uncovered() == board.all_safe_uncovered()
+    assert bits.is_won() == board.is_won()
+    assert bits.is_over() == board.is_over()
+    assert sorted(bits.wrongly_marked()) == sorted(board.wrongly_marked())
+    assert sorted(bits.unmarked_mines()) == sorted(board.unmarked_mines())
+    assert sorted(bits.uncovered_indexes()) == sorted(board.uncovered_indexes())
+    assert sorted(bits.marked_indexes()) == sorted(board.marked_indexes())
+
+def test_bitboard_plays_the_same_as_board():
+    rng = Random(0)
+    for game in range(40):
+        columns = rng.randint(1, 40)
+        rows = rng.randint(1, 25)
+        mines = rng.randint(0, columns * rows // 3)
+        bits = BitBoard(columns, rows, mines, seed=game)
+        board = Board(columns, rows, mines, seed=game)
+        first_idx = rng.randrange(columns * rows)
+        bits.place_mines(first_idx)
+        board.set_mines(bits.mine_idxs, bits.seed)
+        board.first_idx = bits.first_idx
+        assert list(bits.has_mine) == list(board.has_mine)
+        assert list(bits.adjacent_mines) == list(board.adjacent_mines)
+
+        idx = first_idx
+        while not board.is_over():
+            action = rng.random()
+            if action < 0.6:
+                assert sorted(bits.uncover(idx)) == sorted(board.uncover(idx))
+            elif action < 0.85:
+                assert bits.mark(idx) == board.mark(idx)
+            else:
+                assert bits.unmark(idx) == board.unmark(idx)
+            _assert_same(bits, board)
+
+            # Copy and saved state go on independently of the original.
+            if action < 0.05:
+                state = bits.get_state()
+                copy = bits.copy()
+                copy.uncover(rng.randrange(bits.size))
+                copy.mark(rng.randrange(bits.size))
+                assert bits.get_state() == state
+                bits.set_state(copy.get_state())
+                bits.set_state(state)
+                _assert_same(bits, board)
+            idx = rng.randrange(columns * rows)
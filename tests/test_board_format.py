@@ -0,0 +1,31 @@
+import pytest
+
+from board_format import decode_board, encode_board
+from engine import Board
+
+def test_board_without_mines_placed_round_trip():
+    board = Board(16, 16, 40, seed=7)
+    for include_mines in (True, False):
+        decoded = decode_board(encode_board(board, include_mines))
+        assert not decoded.mines_placed
+        assert decoded.seed == 7
+        assert decoded.first_idx is None
+
+        # Mines are placed from the seed on the first click as usual.
+        board_copy = Board(16, 16, 40, seed=7)
+        board_copy.place_mines(100)
+        decoded.place_mines(100)
+        assert list(decoded.has_mine) == list(board_copy.has_mine)
+
+def test_board_without_seed_round_trip():
+    board = Board(9, 9, 10)
+    decoded = decode_board(encode_board(board))
+    assert decoded.seed is None
+    assert not decoded.mines_placed
+
+    board.set_mines([0, 5, 80])
+    decoded = decode_board(encode_board(board))
+    assert decoded.seed is None
+    assert [idx for idx in range(decoded.size) if decoded.has_mine[idx]] == [0, 5, 80]
+    with pytest.raises(ValueError):
+        encode_board(board, include_mines=False)
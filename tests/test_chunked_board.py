@@ -0,0 +1,43 @@
+import chunked_board
+from chunked_board import ChunkedBoard
+from engine import Board
+
+def test_capped_reveal_continues_to_the_same_region(monkeypatch):
+    monkeypatch.setattr(chunked_board, 'MAX_REVEAL', 50)
+    for seed in range(10):
+        chunked = ChunkedBoard(90, 70, 0.08, seed=seed, max_chunks=3)
+        chunked.place_mines(3000)
+        mines = [idx for idx in range(chunked.size) if chunked.has_mine[idx]]
+        board = Board(90, 70, len(mines))
+        board.set_mines(mines, seed)
+
+        uncovered = chunked.uncover(3000)
+        while chunked.unfinished:
+            uncovered += chunked.continue_reveal(50)
+        expected = board.uncover(3000)
+        assert sorted(uncovered) == sorted(expected)
+        assert chunked.uncovered_boxes == len(expected)
+        assert all(chunked.covered[idx] == board.covered[idx]
+            for idx in range(chunked.size))
+
+def test_dropped_chunks_are_restored():
+    board = ChunkedBoard(200, 200, 0.1, seed=5, max_chunks=2)
+    board.place_mines(0)
+    board.uncover(0)
+    marked = next(idx for idx in range(board.size)
+        if board.covered[idx] and idx < 32 * board.columns)
+    board.mark(marked)
+    covered = [board.covered[idx] for idx in range(32 * board.columns)]
+
+    # Other chunks push the played one out of memory.
+    for chunk_column in range(1, 5):
+        board.covered[3 * 32 * board.columns + chunk_column * 32]
+    assert (0, 0) not in board.chunks
+    assert (0, 0) in board.saved_chunks
+    assert (4, 3) not in board.saved_chunks     # only looked at
+
+    assert [board.covered[idx] for idx in range(32 * board.columns)] == covered
+    assert board.marked[marked]
+    assert (0, 0) not in board.saved_chunks
+    assert sorted(board.uncovered_indexes()) == [idx for idx in range(board.size)
+        if not board.covered[idx]]
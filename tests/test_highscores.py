@@ -0,0 +1,59 @@
+import sqlite3
+
+from highscores import board_config, HighscoreRepository
+from settings import Settings
+
+def _config(difficulty='expert', no_guess=False):
+    settings = Settings(diff=difficulty)
+    settings.no_guess = no_guess
+    return board_config(settings)
+
+def test_best_time_is_kept_per_board(tmp_path):
+    repository = HighscoreRepository(tmp_path / 'scores.sqlite3')
+    expert = _config()
+    expert_no_guess = _config(no_guess=True)
+    assert repository.best(expert) is None
+
+    assert repository.record(expert, 120)
+    assert not repository.record(expert, 150)
+    assert repository.record(expert, 90)
+    assert repository.record(expert_no_guess, 200)
+    assert not repository.record(expert_no_guess, 200)
+    assert repository.best(expert) == 90
+    assert repository.best(expert_no_guess) == 200
+    assert repository.best_times() == {'expert': 90}
+    assert repository.best_times(no_guess=True) == {'expert': 200}
+    repository.close()
+
+def test_top_times(tmp_path):
+    repository = HighscoreRepository(tmp_path / 'scores.sqlite3')
+    beginner = _config('beginner')
+    for time in (30, 10, 50, 20, 40):
+        repository.record(beginner, time)
+    repository.record(_config('beginner', no_guess=True), 5)
+    assert repository.top(beginner, 3) == [10, 20, 30]
+    assert repository.top(beginner) == [10, 20, 30, 40, 50]
+    assert repository.top(_config('intermediate')) == []
+    repository.close()
+
+def test_old_table_is_migrated(tmp_path):
+    path = tmp_path / 'scores.sqlite3'
+    con = sqlite3.connect(path)
+    with con:
+        con.execute('CREATE TABLE highscore(difficulty TEXT, time INTEGER)')
+        con.executemany('INSERT INTO highscore VALUES (?, ?)', [
+            ('beginner', 15), ('expert', 300), ('intermediate', None),
+            ('custom', 7)])
+    con.close()
+
+    repository = HighscoreRepository(path)
+    assert repository.best_times() == {'beginner': 15, 'expert': 300}
+    assert repository.top(_config('beginner')) == [15]
+    assert repository.con.execute("SELECT 1 FROM sqlite_master "
+        "WHERE name = 'highscore'").fetchone() is None
+    repository.close()
+
+    # Reopening doesn't move the scores again.
+    repository = HighscoreRepository(path)
+    assert repository.top(_config('expert')) == [300]
+    repository.close()
@@ -0,0 +1,26 @@
+import pytest
+
+from engine import Board
+from mine_placement import max_mines
+
+def test_safe_zone_has_no_mines():
+    for safe_zone in ('cell', 'neighbors'):
+        for first_idx in (0, 4, 40, 80):
+            board = Board(9, 9, 30, safe_zone, seed=first_idx)
+            board.place_mines(first_idx)
+            safe_idxs = [first_idx]
+            if safe_zone == 'neighbors':
+                safe_idxs += board.neighbor_index.adjacent(first_idx)
+            assert not any(board.has_mine[idx] for idx in safe_idxs)
+            assert sum(board.has_mine) == board.mines
+
+def test_not_enough_space_for_safe_zone():
+    # Neighbors of the first click don't fit, so only the click is safe.
+    board = Board(9, 9, max_mines(9, 9))
+    board.place_mines(40)
+    assert not board.has_mine[40]
+    assert sum(board.has_mine) == 80
+
+    board = Board(9, 9, max_mines(9, 9) + 1)
+    with pytest.raises(ValueError):
+        board.place_mines(40)
@@ -0,0 +1,57 @@
+from random import Random
+from time import perf_counter
+
+import probability
+from engine import Board
+from probability import mine_probabilities
+
+def _large_board():
+    """Return 100x100 board with one click, where numbers of ways mines fit
+    into boxes away from the frontier are far too big for float."""
+    board = Board(100, 100, 1234, seed=3)
+    board.uncover(board.size // 2 + 50)
+    return board
+
+def test_large_board_probabilities():
+    board = _large_board()
+    probabilities, exact = mine_probabilities(board, time_budget=5.0)
+    assert exact
+    assert len(probabilities) == sum(board.covered)
+    assert all(0.0 <= probability <= 1.0 for probability in probabilities.values())
+
+def test_large_board_without_time_for_counting():
+    board = _large_board()
+    probabilities, exact = mine_probabilities(board, time_budget=0.0)
+    assert not exact
+    assert all(0.0 <= probability <= 1.0 for probability in probabilities.values())
+
+def test_time_budget_is_shared_by_components(monkeypatch):
+    # Many components which can't all be counted in time.
+    board = Board(100, 100, 2000, seed=0)
+    board.uncover(board.size // 2 + 50)
+    rng = Random(0)
+    safe = [idx for idx in range(board.size) if not board.has_mine[idx]]
+    for idx in rng.sample(safe, 500):
+        board.uncover(idx)
+    # Fake clock moves forward by every look at it, so the test doesn't
+    # depend on speed of the machine.
+    clock = [0.0]
+    def fake_perf_counter():
+        clock[0] += 0.0001
+        return clock[0]
+    monkeypatch.setattr(probability, 'perf_counter', fake_perf_counter)
+    probabilities, exact = mine_probabilities(board, time_budget=0.2, seed=1)
+    assert not exact
+    # Each component only notices that the budget was spent.
+    assert clock[0] < 0.3
+
+def test_huge_board_keeps_to_time_budget():
+    # Ways of placing 120000 mines into a million boxes are far too slow to
+    # count exactly; only their ratios may be computed.
+    board = Board(1000, 1000, 120000, seed=1)
+    board.uncover(board.size // 2 + 500)
+    start = perf_counter()
+    probabilities, exact = mine_probabilities(board, time_budget=0.5)
+    assert perf_counter() - start < 5.0
+    assert len(probabilities) == sum(board.covered)
+    assert all(0.0 <= probability <= 1.0 for probability in probabilities.values())
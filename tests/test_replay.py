@@ -0,0 +1,47 @@
+from random import Random
+
+from engine import Board
+from players import SolverPlayer
+from replay import MARK, RESTART, UNCOVER, replay_headless, ReplayRecorder
+
+def test_replayed_games_end_the_same(tmp_path):
+    path = tmp_path / 'games.mswl'
+    recorder = ReplayRecorder(path)
+    boards = []
+    rng = Random(0)
+    for seed in range(5):
+        board = Board(16, 16, 40, seed=seed)
+        recorder.start_game(board)
+        player = SolverPlayer(seed)
+        while not board.is_over():
+            if rng.random() < 0.1:
+                # Marks are toggled, so some are taken back later.
+                idx = rng.randrange(board.size)
+                if board.marked[idx]:
+                    board.unmark(idx)
+                elif not board.mark(idx):
+                    continue
+                recorder.record(MARK, idx)
+                continue
+            move = player.next_move(board)
+            if move is None:
+                break
+            idx = move[1]
+            if board.marked[idx]:
+                board.unmark(idx)
+                recorder.record(MARK, idx)
+            player.update(UNCOVER, idx, board.uncover(idx))
+            recorder.record(UNCOVER, idx)
+        recorder.record(RESTART)
+        boards.append(board)
+    recorder.close()
+
+    results = replay_headless(path)
+    assert len(results) == len(boards)
+    for board, result in zip(boards, results):
+        replayed = result['board']
+        assert result['won'] == board.is_won()
+        assert result['lost'] == board.lost
+        assert list(replayed.has_mine) == list(board.has_mine)
+        assert list(replayed.covered) == list(board.covered)
+        assert list(replayed.marked) == list(board.marked)
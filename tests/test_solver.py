@@ -0,0 +1,43 @@
+from random import Random
+
+from engine import Board
+from solver import Solver
+
+def _board(columns, rows, mine_idxs, uncovered):
+    """Return board with given mines and uncovered boxes."""
+    board = Board(columns, rows, len(mine_idxs))
+    board.set_mines(mine_idxs)
+    for idx in uncovered:
+        board.uncover(idx)
+    return board
+
+def test_single_box_rule():
+    # 0 1 2     Bottom row is uncovered. Box 3 has two covered neighbors and
+    # 3 4 5     two mines, so both are mines and the other box of 5 is safe.
+    board = _board(3, 2, [0, 1], [3, 4, 5])
+    assert Solver(board).solve() == ({2}, {0, 1})
+
+def test_subset_rule():
+    # 0 1 2 3   Every uncovered box shows 1. Boxes of 4 are subset of boxes
+    # 4 5 6 7   of 5, so 2 is safe; the same way 1 is safe because of 7 and 6.
+    board = _board(4, 2, [0, 3], [4, 5, 6, 7])
+    solver = Solver(board)
+    assert not solver._apply_single_rule(*solver._get_constraint(4))
+    assert solver.solve() == ({1, 2}, {0, 3})
+
+def test_update_matches_solving_from_scratch():
+    for seed in range(10):
+        board = Board(16, 16, 40, seed=seed)
+        rng = Random(seed)
+        solver = Solver(board)
+        solver.update(board.uncover(rng.randrange(board.size)))
+        while not board.is_over():
+            safe, mines = solver.solve()
+            assert (safe, mines) == Solver(board).solve()
+            if safe:
+                idx = next(iter(safe))
+            else:
+                idx = rng.choice([idx for idx in range(board.size)
+                    if board.covered[idx] and not board.has_mine[idx]])
+            # Uncovering box with no adjacent mines uncovers whole region.
+            solver.update(board.uncover(idx))